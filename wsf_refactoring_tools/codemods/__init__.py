@@ -1,3 +1,6 @@
 from .add_global_statements import AddGlobalStatements
 from .remove_logfunc import RemoveLogfuncDefAndImports, ReplaceFuncWithLoggerCommand
 from .add_imports import AddImportsCodemodCommand
+from .replace_string import ReplaceStringCommand
+from .logfunc_to_logger import LogfuncToLoggerCommand
+from .parallel import FileFailure, run_parallel
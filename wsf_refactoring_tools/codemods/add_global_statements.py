@@ -1,9 +1,17 @@
+from functools import lru_cache
+
 from .imports import *
 from .codemod_base import CodemodBase
 
 Statement: TypeVar = Union[cst.SimpleStatementLine, cst.BaseCompoundStatement]
 
 
+@lru_cache(maxsize=None)
+def _parse_statement(statement: str) -> Statement:
+    """Parse a statement once; callers clone the result for each module."""
+    return cst.parse_statement(statement)
+
+
 class AddGlobalStatements(CodemodBase):
     """Add statements to a module immediately after the imports block.
 
@@ -14,6 +22,8 @@ class AddGlobalStatements(CodemodBase):
     works.
     """
 
+    __slots__ = ("_statements", "_parsed_statements")
+
     CONTEXT_KEY = "AddGlobalStatements"
     DESCRIPTION = "Add"
 
@@ -24,22 +34,59 @@ class AddGlobalStatements(CodemodBase):
         Based on the implementation of
         :obj:`libcst.codemod.visitors.AddImportsVisitor.add_needed_import`.
         """
-        statements = AddGlobalStatements._get_statements_from_context(context)
-        statements.add(statement)
-        context.scratch[AddGlobalStatements.CONTEXT_KEY] = statements
+        # Statements are kept as the keys of a dict, which drops duplicates
+        # while preserving the order in which they were scheduled
+        key = AddGlobalStatements.CONTEXT_KEY
+        if key not in context.scratch:
+            context.scratch[key] = {}
+        context.scratch[key].setdefault(statement, None)
+
+    @staticmethod
+    def _get_statements_from_context(context: mod.CodemodContext) -> Iterable[str]:
+        return context.scratch.get(AddGlobalStatements.CONTEXT_KEY, ())
+
+    @staticmethod
+    def _is_module_header(statement: Statement) -> bool:
+        """Check for a docstring or __strict__ flag, which precede imports."""
+        if not isinstance(statement, cst.SimpleStatementLine):
+            return False
+        if len(statement.body) != 1:
+            return False
+        small = statement.body[0]
+        if isinstance(small, cst.Expr):
+            return isinstance(small.value, cst.SimpleString)
+        return (
+            isinstance(small, cst.Assign)
+            and len(small.targets) == 1
+            and isinstance(small.targets[0].target, cst.Name)
+            and small.targets[0].target.value == "__strict__"
+        )
 
     @staticmethod
-    def _get_statements_from_context(context: mod.CodemodContext) -> Set[str]:
-        return context.scratch.get(AddGlobalStatements.CONTEXT_KEY, set())
+    def _is_import_line(statement: Statement) -> bool:
+        return (
+            isinstance(statement, cst.SimpleStatementLine)
+            and len(statement.body) == 1
+            and isinstance(statement.body[0], (cst.Import, cst.ImportFrom))
+        )
 
     def _split_module_with_empty_line(
-        self, node: cst.Module, updated_node: cst.Module
+        self, module: cst.Module
     ) -> Tuple[List[Statement], List[Statement]]:
-        visitor = mod.visitors.AddImportsVisitor(self.context)
-        node.visit(visitor)
-        before_add, after_add, after_imports = visitor._split_module(node, updated_node)
-        postlude = visitor._insert_empty_line(after_imports)
-        return before_add + after_add, postlude
+        """Split the module body at the end of its leading block of imports.
+
+        This mirrors the placement rules of
+        :obj:`libcst.codemod.visitors.AddImportsVisitor` in a single scan of
+        the top-level statements.
+        """
+        body = module.body
+        split = 1 if body and self._is_module_header(body[0]) else 0
+        while split < len(body) and self._is_import_line(body[split]):
+            split += 1
+        prelude, postlude = list(body[:split]), list(body[split:])
+        if postlude:
+            postlude[0] = self._ensure_blank_first_line(postlude[0])
+        return prelude, postlude
 
     def _ensure_blank_first_line(self, statement: Statement) -> Statement:
         if not statement.leading_lines:
@@ -53,22 +100,21 @@ class AddGlobalStatements(CodemodBase):
 
     def __init__(self, context: mod.CodemodContext, statements: List[str] = []):
         super().__init__(context)
-        self._statements = set(statements).union(
-            self._get_statements_from_context(context)
+        self._statements = dict.fromkeys(
+            [*statements, *self._get_statements_from_context(context)]
         )
+        # Cloning a cached parse is cheaper than parsing again, and keeps each
+        # module from sharing node objects with others
+        self._parsed_statements = [
+            _parse_statement(s).deep_clone() for s in self._statements
+        ]
 
     def leave_Module(self, original: cst.Module, updated: cst.Module) -> cst.Module:
-        """Insert statements after all imports and before all others.
-
-        NOTE: The implementation relies on the helper methods
-        :obj:`libcst.codemod.visitors.AddImportsVisitor._split_module` and
-        :obj:`libcst.codemod.visitors.AddImportsVisitor._insert_empty_line`,
-        which are not guaranteed to be stable since they are nonpublic.
-        """
-        if not self._statements:
+        """Insert statements after all imports and before all others."""
+        if not self._parsed_statements:
             return updated
-        prelude, postlude = self._split_module_with_empty_line(original, updated)
-        statements = [cst.parse_statement(s) for s in self._statements]
+        prelude, postlude = self._split_module_with_empty_line(updated)
+        statements = self._parsed_statements
         return updated.with_changes(
             body=(
                 *prelude,
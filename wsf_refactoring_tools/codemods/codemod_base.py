@@ -1,7 +1,14 @@
+import inspect
+from contextlib import contextmanager
+from dataclasses import replace
+
 from .imports import *
 
+# Key under which the source of the file being transformed is cached
+_SOURCE_KEY = "CodemodBase.source"
+
 
-class CodemodBase(mod.VisitorBasedCodemodCommand):
+class CodemodBase(mod.CodemodCommand, cst.CSTTransformer):
     """Automate chaining of codemods via the context.scratch mechanism.
 
     The :obj:`libcst` codemods :obj:`libcst.codemod.visitors.AddImportsVisitor`
@@ -9,20 +16,231 @@ class CodemodBase(mod.VisitorBasedCodemodCommand):
     automatically by libcst, without any explicit calls to their
     transform_module methods.  This wrapper class extends that mechanicsm
     to subclasses defined in this package.
+
+    Unlike :obj:`libcst.codemod.VisitorBasedCodemodCommand`, this is a plain
+    :obj:`libcst.CSTTransformer` without the matcher-decorator machinery, which
+    is evaluated on every node visited.  Subclasses hook nodes with plain
+    visit_*/leave_* methods, which are looked up once per node type and cached
+    on the subclass.
     """
 
+    __slots__ = ()
+
     AUTOCHAIN: bool = True
 
+    # Codemods that can be scheduled via their CONTEXT_KEY, in definition order
+    _registry: Tuple[Type["CodemodBase"], ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "CONTEXT_KEY" in cls.__dict__:
+            CodemodBase._registry += (cls,)
+        cls._visit_funcs: Dict[Any, Optional[Callable]] = {}
+        cls._leave_funcs: Dict[Any, Optional[Callable]] = {}
+
+    @classmethod
+    def _resolve(cls, cache: Dict[Any, Optional[Callable]], key: Any, name: str):
+        """Look up and cache the visitor function called name, if overridden."""
+        func = getattr(cls, name, None)
+        if func is getattr(cst.CSTTransformer, name, None):
+            # The no-op stubs on CSTTransformer aren't worth calling
+            func = None
+        cache[key] = func
+        return func
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        try:
+            func = self._visit_funcs[type(node)]
+        except KeyError:
+            func = self._resolve(
+                self._visit_funcs, type(node), f"visit_{type(node).__name__}"
+            )
+        return func is None or func(self, node) is not False
+
+    def on_leave(self, original: cst.CSTNode, updated: cst.CSTNode) -> Any:
+        try:
+            func = self._leave_funcs[type(original)]
+        except KeyError:
+            func = self._resolve(
+                self._leave_funcs, type(original), f"leave_{type(original).__name__}"
+            )
+        return updated if func is None else func(self, original, updated)
+
+    def on_visit_attribute(self, node: cst.CSTNode, attribute: str) -> None:
+        key = (type(node), attribute)
+        try:
+            func = self._visit_funcs[key]
+        except KeyError:
+            func = self._resolve(
+                self._visit_funcs, key, f"visit_{type(node).__name__}_{attribute}"
+            )
+        if func is not None:
+            func(self, node)
+
+    def on_leave_attribute(self, original: cst.CSTNode, attribute: str) -> None:
+        key = (type(original), attribute)
+        try:
+            func = self._leave_funcs[key]
+        except KeyError:
+            func = self._resolve(
+                self._leave_funcs, key, f"leave_{type(original).__name__}_{attribute}"
+            )
+        if func is not None:
+            func(self, original)
+
+    @contextmanager
+    def _handle_metadata_reference(self, module: cst.Module) -> Iterator[cst.Module]:
+        """Skip the deepcopy of the module for codemods without dependencies.
+
+        :obj:`libcst.codemod.Codemod` wraps the module in a
+        :obj:`libcst.metadata.MetadataWrapper` before every transform, which
+        deep-clones the whole tree.  Subclasses that do not declare any
+        METADATA_DEPENDENCIES either need no metadata or look it up with
+        :meth:`get_lazy_metadata`, which works on the uncopied module as long
+        as no node object occurs twice in it.  That is true of a parsed module,
+        and stays true of the output of codemods that build a fresh node for
+        every replacement, as all of those in this package do.
+        """
+        if self.get_inherited_dependencies():
+            with super()._handle_metadata_reference(module) as tree:
+                yield tree
+            return
+        oldwrapper = self.context.wrapper
+        wrapper = meta.MetadataWrapper(module, unsafe_skip_copy=True)
+        self.context = replace(self.context, wrapper=wrapper)
+        try:
+            yield wrapper.module
+        finally:
+            self.context = replace(self.context, wrapper=oldwrapper)
+
+    def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+        return tree.visit(self)
+
+    def get_lazy_metadata(self, key: meta.ProviderT, node: cst.CSTNode) -> Any:
+        """Look up metadata that is not declared in METADATA_DEPENDENCIES.
+
+        The provider runs over the module the first time it is needed during a
+        transform, and the module's wrapper caches the result for the rest of
+        it, so metadata that is only needed occasionally is only computed then.
+        """
+        return self.context.wrapper.resolve(key)[node]
+
+    def _read_source(self) -> Optional[bytes]:
+        """Return the raw contents of the file being transformed, if known.
+
+        Subclasses can search these bytes to decide cheaply whether a module
+        needs to be visited at all.  The file is read once per context and
+        shared, via the scratch dict, by all the codemods chained on it.
+        """
+        filename = self.context.filename
+        if filename is None:
+            return None
+        cached = self.context.scratch.get(_SOURCE_KEY)
+        if cached is not None and cached[0] == filename:
+            return cached[1]
+        try:
+            with open(filename, "rb") as f:
+                source = f.read()
+        except OSError:
+            source = None
+        CodemodBase.cache_source(self.context, source)
+        return source
+
+    @staticmethod
+    def cache_source(context: mod.CodemodContext, source: Optional[bytes]) -> None:
+        """Record the source of context.filename, which the caller has read.
+
+        Codemods then use it for their prefilters instead of reading the file
+        again.
+        """
+        context.scratch[_SOURCE_KEY] = (context.filename, source)
+
+    def _instantiate_and_run(
+        self, transform: Type[mod.Codemod], tree: cst.Module
+    ) -> cst.Module:
+        """Run one of the helper transforms libcst chains after every command.
+
+        :obj:`libcst.codemod.CodemodCommand` runs AddImportsVisitor and
+        RemoveImportsVisitor whenever their keys are in context.scratch, but
+        never removes the keys, so every codemod chained afterwards would run
+        them again.  Dropping the key once they have run means they only run
+        again if something schedules more work for them.
+        """
+        tree = super()._instantiate_and_run(transform, tree)
+        self.context.scratch.pop(transform.CONTEXT_KEY, None)
+        return tree
+
+    def _source_lacks(self, needles: Iterable[bytes]) -> bool:
+        """Check that the file being transformed contains none of needles.
+
+        This is False whenever the source can't be read, so that a codemod
+        falls back to visiting the tree.  The file on disk is the input to the
+        whole chain, so codemods must only use this for needles that earlier
+        codemods in a chain can't introduce.
+        """
+        source = self._read_source()
+        return source is not None and not any(n in source for n in needles)
+
     def transform_module(self, tree: cst.Module) -> cst.Module:
         tree = super().transform_module(tree)
-        if self.__class__.AUTOCHAIN:
-            if self.__class__.CONTEXT_KEY in self.context.scratch:
-                del self.context.scratch[self.__class__.CONTEXT_KEY]
-            for transform in self.__class__.__base__.__subclasses__():
-                if (
-                    transform.CONTEXT_KEY in self.context.scratch
-                    and transform.CONTEXT_KEY != self.__class__.CONTEXT_KEY
-                ):
-                    tree = self._instantiate_and_run(transform, tree)
-
+        if self.AUTOCHAIN:
+            self.context.scratch.pop(self.CONTEXT_KEY, None)
+            tree = _ChainedCodemods(self.context).transform_module(tree)
         return tree
+
+
+class _ChainedCodemods(mod.MagicArgsCodemodCommand):
+    """Run every codemod scheduled in context.scratch in a single command.
+
+    Transforms are instantiated from the scratch values by
+    :obj:`libcst.codemod.MagicArgsCodemodCommand` with autochaining disabled,
+    so each scheduled codemod runs exactly once, however many of the others
+    schedule it.  A codemod whose required arguments aren't in scratch is
+    skipped with a warning.
+    """
+
+    DESCRIPTION: str = "Run the codemods scheduled in context.scratch."
+
+    @contextmanager
+    def _handle_metadata_reference(self, module: cst.Module) -> Iterator[cst.Module]:
+        # The chained codemods resolve their own metadata
+        yield module
+
+    def get_transforms(self) -> Iterator[Type[CodemodBase]]:
+        scratch = self.context.scratch
+        while True:
+            # Codemods can schedule others, so look again after each one runs
+            for transform in CodemodBase._registry:
+                if transform.CONTEXT_KEY not in scratch:
+                    continue
+                missing = self._missing_args(transform)
+                if missing:
+                    # Only codemods whose arguments are all in scratch can run
+                    del scratch[transform.CONTEXT_KEY]
+                    self.warn(
+                        f"Skipping {transform.__name__}, which was scheduled "
+                        f"without the arguments {', '.join(missing)}"
+                    )
+                    continue
+                yield transform
+                break
+            else:
+                return
+
+    def _missing_args(self, transform: Type[CodemodBase]) -> List[str]:
+        """List the required arguments of transform that aren't in scratch."""
+        params = inspect.signature(transform.__init__).parameters.values()
+        return [
+            param.name
+            for param in params
+            if param.name not in ("self", "context")
+            and param.default is param.empty
+            and param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+            and param.name not in self.context.scratch
+        ]
+
+    def _instantiate(self, transform: Type[CodemodBase]) -> CodemodBase:
+        inst = super()._instantiate(transform)
+        del self.context.scratch[transform.CONTEXT_KEY]
+        inst.AUTOCHAIN = False
+        return inst
@@ -3,11 +3,14 @@ from ast import literal_eval
 from typing import (
     Any,
     Dict,
+    Iterable,
     Iterator,
     List,
     Mapping,
+    Optional,
     Set,
     Tuple,
+    Type,
     TypeVar,
     Union,
     Callable,
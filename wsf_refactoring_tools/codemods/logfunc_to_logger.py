@@ -0,0 +1,215 @@
+from dataclasses import dataclass
+from typing import Generator, Iterable, List, Type, Union
+from libcst.helpers import get_full_name_for_node
+
+from .imports import *
+from .add_global_statements import AddGlobalStatements
+from .codemod_base import CodemodBase
+from .remove_logfunc import (
+    RemoveLogfuncDefAndImports,
+    RemoveLogfuncMixin,
+    ReplaceFuncWithLoggerCommand,
+)
+
+
+@dataclass(slots=True)
+class _DeferredCall:
+    """A call visited before its name was known to be a logfunc."""
+
+    original: cst.Call
+    updated: cst.Call
+    function: str
+    handled_exceptions: Tuple[str, ...]
+
+
+class _CallReplacer(cst.CSTTransformer):
+    """Swap in replacements for calls, identified by the call node objects."""
+
+    def __init__(self, replacements: Dict[int, cst.Call]) -> None:
+        super().__init__()
+        self._replacements = replacements
+        self._remaining = len(replacements)
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Once every call has been replaced, the rest of the module is skipped
+        return self._remaining > 0
+
+    def leave_Call(self, original: cst.Call, updated: cst.Call) -> cst.Call:
+        replacement = self._replacements.get(id(original))
+        if replacement is None:
+            return updated
+        self._remaining -= 1
+        return replacement
+
+
+class _FusedLogfuncCodemod(RemoveLogfuncMixin, ReplaceFuncWithLoggerCommand):
+    """Remove defs and imports of a logfunc and replace its calls in one walk.
+
+    The defs and imports are removed by :obj:`RemoveLogfuncMixin`, and the
+    names they bound go straight into this instance's logfuncs rather than
+    through context.scratch.  Only calls to those names are replaced.  A call
+    visited before its name is bound (e.g. in a function defined above the
+    import) is recorded instead, and rewritten once the walk is over.
+    """
+
+    __slots__ = ("_logfunc", "_deferred_calls", "_late_logfuncs")
+
+    def __init__(
+        self,
+        context: mod.CodemodContext,
+        logfunc: str = "eprint",
+        logger_name: str = "logger",
+        raise_strict: bool = False,
+    ) -> None:
+        super().__init__(
+            context,
+            logger_name=logger_name,
+            logfuncs=(),
+            raise_strict=raise_strict,
+        )
+        self._logfunc = logfunc
+        # Calls to other functions so far by name, and logfuncs found too late
+        self._deferred_calls: Dict[str, List[_DeferredCall]] = {}
+        self._late_logfuncs: List[str] = []
+
+    def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+        updated = super().transform_module_impl(tree)
+        if self._late_logfuncs:
+            updated = self._replace_late_calls(tree, updated)
+        return updated
+
+    def _replace_late_calls(
+        self, module: cst.Module, updated: cst.Module
+    ) -> cst.Module:
+        # Format strings postprocessed by leave_Module are already converted
+        self._postprocess = set()
+        if not self._found_logfunc_call:
+            self._found_logfunc_call = True
+            self.check_global_scope_for_logger(module)
+        mod.visitors.AddImportsVisitor.add_needed_import(self.context, "logging")
+
+        # Restore the state the walk was in when each call was visited
+        saved = self._current_function, self._handled_exceptions
+        replacements = {}
+        try:
+            for name in self._late_logfuncs:
+                for call in self._deferred_calls[name]:
+                    self._current_function = call.function
+                    self._handled_exceptions = dict.fromkeys(call.handled_exceptions, 1)
+                    replacements[id(call.updated)] = self._build_logger_call(
+                        call.original, call.updated, self._references_exception(call)
+                    )
+        finally:
+            self._current_function, self._handled_exceptions = saved
+        updated = updated.visit(_CallReplacer(replacements))
+        return self.postprocess_assignment_nodes(module, updated)
+
+    @staticmethod
+    def _references_exception(call: _DeferredCall) -> bool:
+        if not call.handled_exceptions:
+            return False
+        handled = m.Name(value=m.MatchIfTrue(call.handled_exceptions.__contains__))
+        return any(m.findall(arg, m.Arg(value=handled)) for arg in call.original.args)
+
+    def _prefilter_needles(self) -> Iterable[bytes]:
+        # Every name scheduled in this walk is bound by a def or import of
+        # the logfunc, so the file must mention it
+        yield self._logfunc.encode()
+        yield from super()._prefilter_needles()
+
+    def _schedule_replacement(self, name: str) -> None:
+        if name not in self._logfuncs:
+            self._add_logfunc(name)
+            if name in self._deferred_calls:
+                self._late_logfuncs.append(name)
+
+    def _callee_name(self, func: cst.BaseExpression) -> Optional[str]:
+        if type(func) is cst.Name:
+            return func.value
+        if type(func) is cst.Attribute and func.attr.value == self._logfunc:
+            return get_full_name_for_node(func)
+        return None
+
+    def leave_Call(self, original: cst.Call, updated: cst.Call) -> cst.Call:
+        if self.is_logfunc_call(original):
+            return self.change_logfunc_to_logger(original, updated)
+        name = self._callee_name(original.func)
+        if name is not None:
+            calls = self._deferred_calls.get(name)
+            if calls is None:
+                calls = self._deferred_calls[name] = []
+            calls.append(
+                _DeferredCall(
+                    original,
+                    updated,
+                    self._current_function,
+                    tuple(self._handled_exceptions),
+                )
+            )
+        return updated
+
+    def leave_FunctionDef(
+        self, original: cst.FunctionDef, updated: cst.FunctionDef
+    ) -> Union[cst.FunctionDef, cst.RemovalSentinel]:
+        updated = super().leave_FunctionDef(original, updated)
+        return self._leave_logfunc_def(original, updated)
+
+
+class LogfuncToLoggerCommand(mod.MagicArgsCodemodCommand):
+    """Replace a custom log function with standard logging in one command.
+
+    Does the work of :obj:`RemoveLogfuncDefAndImports` and
+    :obj:`ReplaceFuncWithLoggerCommand` in a single walk of the module, then
+    runs :obj:`AddGlobalStatements` on the same module object, so a module is
+    parsed and printed once.  Each transform is run with autochaining
+    disabled, since this command already schedules all of them.
+    """
+
+    DESCRIPTION: str = (
+        "Remove a custom log function and replace its calls with logger calls."
+    )
+
+    @staticmethod
+    def add_args(parser: argparse.ArgumentParser) -> None:
+        RemoveLogfuncDefAndImports.add_args(parser)
+        parser.add_argument(
+            "--logger-name",
+            dest="logger_name",
+            metavar="LOGGER_NAME",
+            help="Name of logger to instantiate and call",
+            type=str,
+            required=False,
+            default="logger",
+        )
+        parser.add_argument(
+            "--raise-strict",
+            dest="raise_strict",
+            metavar="RAISE_STRICT",
+            help="Strict mode (aggressively raise exceptions on errors)",
+            required=False,
+            type=bool,
+            default=False,
+        )
+
+    def __init__(
+        self,
+        context: mod.CodemodContext,
+        logfunc: str = "eprint",
+        logger_name: str = "logger",
+        raise_strict: bool = False,
+    ) -> None:
+        super().__init__(
+            context,
+            logfunc=logfunc,
+            logger_name=logger_name,
+            raise_strict=raise_strict,
+        )
+
+    def get_transforms(self) -> Generator[Type[CodemodBase], None, None]:
+        yield _FusedLogfuncCodemod
+        yield AddGlobalStatements
+
+    def _instantiate(self, transform: Type[CodemodBase]) -> CodemodBase:
+        inst = super()._instantiate(transform)
+        inst.AUTOCHAIN = False
+        return inst
@@ -0,0 +1,72 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Type
+
+from .codemod_base import CodemodBase
+from .imports import *
+
+
+@dataclass(frozen=True)
+class FileFailure:
+    """A file that a worker failed to transform.
+
+    The exception itself isn't kept, since not every exception (libcst's
+    ParserSyntaxError among them) survives being pickled back from a worker.
+    """
+
+    error: str
+    traceback_str: str
+
+
+def _transform_file(
+    job: Tuple[str, Type[mod.Codemod], Dict[str, Any]]
+) -> Union[bool, FileFailure]:
+    """Run a codemod on one file in a worker, writing back any changes."""
+    filename, command_cls, kwargs = job
+    try:
+        with open(filename, "rb") as f:
+            source = f.read()
+        tree = cst.parse_module(source)
+        # Hand the bytes we already have to CodemodBase._read_source, so the
+        # prefilters don't open and read the file a second time.
+        context = mod.CodemodContext(filename=filename)
+        CodemodBase.cache_source(context, source)
+        command = command_cls(context, **kwargs)
+        new_source = command.transform_module(tree).bytes
+        if new_source == source:
+            return False
+        with open(filename, "wb") as f:
+            f.write(new_source)
+    except mod.SkipFile:
+        return False
+    except Exception as e:
+        # One bad file shouldn't lose the results for all the others
+        return FileFailure(repr(e), traceback.format_exc())
+    return True
+
+
+def run_parallel(
+    files: Iterable[str],
+    command_cls: Type[mod.Codemod],
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> Dict[str, Union[bool, FileFailure]]:
+    """Run a codemod over many files using a pool of worker processes.
+
+    Each worker parses its file, instantiates command_cls with a fresh
+    :obj:`libcst.codemod.CodemodContext` and the given keyword arguments, and
+    writes the result back in place.  No CST objects cross process
+    boundaries, so the only thing pickled per file is its name.
+
+    Returns a mapping from each filename to whether it was modified, or to a
+    :obj:`FileFailure` if transforming it raised an exception.
+    """
+    files = list(files)
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(files) // (4 * workers))
+    jobs = [(filename, command_cls, kwargs) for filename in files]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        changed = executor.map(_transform_file, jobs, chunksize=chunksize)
+        return dict(zip(files, changed))
@@ -1,15 +1,92 @@
-from ast import literal_eval
+import string
+import sys
 from dataclasses import dataclass
-from typing import Any, List, Literal, Optional, Tuple, Union
+from typing import Any, FrozenSet, Iterable, List, Literal, Optional, Tuple, Union
+from libcst.helpers import get_full_name_for_node
 from .imports import *
-from ..utils.matchers import LogFunctionCall, TemplateString
+from ..utils.literals import evaluate_string_literal
+from ..utils.matchers import FILE_ARG_NAMES, LOGLEVELS
 from .add_global_statements import AddGlobalStatements
 from .codemod_base import CodemodBase
 
-LOGLEVELS = ["DEBUG", "INFO", "WARNING", "WARN", "ERROR", "CRITICAL", "FATAL"]
+_PRUNED_NODE_TYPES = (
+    cst.Annotation,
+    cst.SimpleString,
+    cst.Integer,
+    cst.Float,
+    cst.Imaginary,
+)
+
+# Replacement nodes are built afresh for every call rewritten: metadata is
+# keyed by node identity, so a node object must not occur twice in a module
+
+
+def _logger_attr(logger: str, method: str) -> cst.Attribute:
+    """Build the func node of a logger call, e.g. logger.info."""
+    # Attribute's default dot is a single instance shared by every Attribute
+    return cst.Attribute(value=cst.Name(logger), attr=cst.Name(method), dot=cst.Dot())
+
+
+def _exception_args(exc_scope: str) -> Tuple[cst.Arg, ...]:
+    """Build the arguments of the logger.exception call for a scope."""
+    msg = cst.SimpleString(f'"Error in function: {exc_scope}"')
+    exc_info = cst.Arg(
+        keyword=cst.Name("exc_info"),
+        value=cst.Name("True"),
+        equal=cst.AssignEqual(
+            whitespace_before=cst.SimpleWhitespace(""),
+            whitespace_after=cst.SimpleWhitespace(""),
+        ),
+    )
+    return (cst.Arg(value=msg), exc_info)
+
+
+_PERCENT_ESCAPES = str.maketrans({"%": "%%"})
+_FORMATTER = string.Formatter()
+
+
+def _brace_to_percent(fmt: str) -> Tuple[str, int]:
+    """Convert a "{}"-style format string to the equivalent %-style one.
+
+    Returns the converted string and its number of placeholders.  Raises
+    ValueError if fmt is malformed or has a field other than a bare {}.
+    """
+    parts = []
+    fields = 0
+    for literal, field, spec, conversion in _FORMATTER.parse(fmt):
+        # The parser has already unescaped {{ and }}, but literal percent
+        # signs have to be escaped, or they would be read as specifiers
+        parts.append(literal.translate(_PERCENT_ESCAPES))
+        if field is None:
+            continue
+        if field or spec or conversion:
+            raise ValueError(f"Cannot convert format field in {fmt!r}")
+        parts.append("%s")
+        fields += 1
+    return "".join(parts), fields
+
+
+def _is_format_call(node: cst.BaseExpression) -> bool:
+    """Check whether `node` is a call of the form `<expr>.format(...)`."""
+    return (
+        isinstance(node, cst.Call)
+        and isinstance(node.func, cst.Attribute)
+        and node.func.attr.value == "format"
+    )
 
 
-@dataclass
+def _dotted_attrs(names: Iterable[str]) -> FrozenSet[str]:
+    return frozenset(name.rpartition(".")[2] for name in names if "." in name)
+
+
+def _trailing_name(alias: cst.ImportAlias) -> str:
+    """Get the last component of an imported name, e.g. c in a.b.c."""
+    # Cheaper than building the whole dotted name with evaluated_name
+    name = alias.name
+    return name.attr.value if isinstance(name, cst.Attribute) else name.value
+
+
+@dataclass(slots=True)
 class CSTString:
     name: Optional[cst.Name] = None
     literal: Optional[cst.SimpleString] = None
@@ -17,57 +94,35 @@ class CSTString:
     computed_value: Optional[cst.Call] = None
 
 
-class RemoveLogfuncDefAndImports(CodemodBase):
-    """Remove defs and imports of a specified function.
+class RemoveLogfuncMixin:
+    """Visitor callbacks that remove the defs and imports of a logfunc.
 
-    The function to be removed is assumed to be a custom logging function.
-    Thus, on encountering an import or def of such a function, its name or
-    alias is scheduled for replacement by standard logging methods via a
-    call to :obj:`ReplaceFuncWithLoggerCommand`.replace_logfunc.
+    Classes using this mixin store the name of the logfunc in `_logfunc` and
+    implement `_schedule_replacement`, which is passed the name bound by each
+    removed def or import.  Defs are removed by `_leave_logfunc_def`, which
+    the class calls from its own leave_FunctionDef.
     """
 
-    DESCRIPTION = "Remove imports and defs of specified function."
-    CONTEXT_KEY = "RemoveFuncDefAndImports"
+    __slots__ = ()
 
-    @staticmethod
-    def add_args(parser: argparse.ArgumentParser) -> None:
-        parser.add_argument(
-            "--logfunc",
-            dest="logfunc",
-            metavar="LOGFUNC",
-            help="Name of custom log function to replace",
-            type=str,
-            required=False,
-            default="eprint",
-        )
+    _logfunc: str
 
-    def __init__(self, context: mod.CodemodContext, logfunc: str = "eprint") -> None:
-        super().__init__(context)
-        self._logfunc = logfunc
+    def _schedule_replacement(self, name: str) -> None:
+        raise NotImplementedError
 
     def _filter_import_aliases(
         self, names: List[cst.ImportAlias]
     ) -> List[cst.ImportAlias]:
         keep, discard = [], []
         for node in names:
-            if node.evaluated_name.split(".")[-1] != self._logfunc:
+            if _trailing_name(node) != self._logfunc:
                 keep.append(node)
-            elif node.asname is not None:
-                discard.append(node)
-                ReplaceFuncWithLoggerCommand.replace_logfunc(self.context, node.asname)
             else:
                 discard.append(node)
-                ReplaceFuncWithLoggerCommand.replace_logfunc(
-                    self.context, node.name.value
-                )
 
-        if keep:
-            # If last import is removed, make sure there's no trailing comma
-            if keep[-1] != names[-1]:
-                keep = [
-                    *keep[:-1],
-                    keep[-1].with_changes(comma=cst.MaybeSentinel.DEFAULT),
-                ]
+        # If last import is removed, make sure there's no trailing comma
+        if keep and keep[-1] is not names[-1]:
+            keep[-1] = keep[-1].with_changes(comma=cst.MaybeSentinel.DEFAULT)
         return keep, discard
 
     def _remove_references(self, node: Union[cst.ImportAlias, cst.FunctionDef]) -> None:
@@ -78,11 +133,9 @@ class RemoveLogfuncDefAndImports(CodemodBase):
                 name = node.evaluated_name
         elif isinstance(node, cst.FunctionDef):
             name = node.name.value
-        ReplaceFuncWithLoggerCommand.replace_logfunc(self.context, node.name.value)
+        self._schedule_replacement(name)
 
-    @m.leave(m.Import())
-    @m.leave(m.ImportFrom())
-    def leave_import_statement(
+    def _leave_import_statement(
         self,
         original: Union[cst.Import, cst.ImportFrom],
         updated: Union[cst.Import, cst.ImportFrom],
@@ -102,8 +155,17 @@ class RemoveLogfuncDefAndImports(CodemodBase):
         else:
             return cst.RemoveFromParent()
 
-    @m.leave(m.FunctionDef())
-    def remove_logfunc(
+    def leave_Import(
+        self, original: cst.Import, updated: cst.Import
+    ) -> Union[cst.Import, cst.RemovalSentinel]:
+        return self._leave_import_statement(original, updated)
+
+    def leave_ImportFrom(
+        self, original: cst.ImportFrom, updated: cst.ImportFrom
+    ) -> Union[cst.ImportFrom, cst.RemovalSentinel]:
+        return self._leave_import_statement(original, updated)
+
+    def _leave_logfunc_def(
         self, original: cst.FunctionDef, updated: cst.FunctionDef
     ) -> Union[cst.FunctionDef, cst.RemovalSentinel]:
         if original.name.value == self._logfunc:
@@ -113,6 +175,56 @@ class RemoveLogfuncDefAndImports(CodemodBase):
             return updated
 
 
+class RemoveLogfuncDefAndImports(RemoveLogfuncMixin, CodemodBase):
+    """Remove defs and imports of a specified function.
+
+    The function to be removed is assumed to be a custom logging function.
+    Thus, on encountering an import or def of such a function, its name or
+    alias is scheduled for replacement by standard logging methods via a
+    call to :obj:`ReplaceFuncWithLoggerCommand`.replace_logfunc.
+    """
+
+    __slots__ = ("_logfunc",)
+
+    DESCRIPTION = "Remove imports and defs of specified function."
+    CONTEXT_KEY = "RemoveFuncDefAndImports"
+
+    @staticmethod
+    def add_args(parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--logfunc",
+            dest="logfunc",
+            metavar="LOGFUNC",
+            help="Name of custom log function to replace",
+            type=str,
+            required=False,
+            default="eprint",
+        )
+
+    def __init__(self, context: mod.CodemodContext, logfunc: str = "eprint") -> None:
+        super().__init__(context)
+        self._logfunc = logfunc
+
+    def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+        if self._source_lacks((self._logfunc.encode(),)):
+            return tree
+        return super().transform_module_impl(tree)
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Imports and defs are statements, so no expression can contain one
+        if isinstance(node, cst.BaseExpression):
+            return False
+        return super().on_visit(node)
+
+    def _schedule_replacement(self, name: str) -> None:
+        ReplaceFuncWithLoggerCommand.replace_logfunc(self.context, name)
+
+    def leave_FunctionDef(
+        self, original: cst.FunctionDef, updated: cst.FunctionDef
+    ) -> Union[cst.FunctionDef, cst.RemovalSentinel]:
+        return self._leave_logfunc_def(original, updated)
+
+
 class ReplaceFuncWithLoggerCommand(CodemodBase):
     """Replace calls to a specified function `func` with logger calls.
 
@@ -143,24 +255,45 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
         "Replace calls to custom logging function with standard Python logging methods."
     )
     CONTEXT_KEY: str = "ReplaceFuncWithLoggerCommand"
-    METADATA_DEPENDENCIES = (
-        cst.metadata.QualifiedNameProvider,
-        cst.metadata.PositionProvider,
-        cst.metadata.ScopeProvider,
+    # The libcst base classes still provide a __dict__, but per-file state
+    # read in the visitor callbacks is kept in slots
+    __slots__ = (
+        "_logfuncs",
+        "_logfunc_attrs",
+        "_excs_in_logfunc_call",
+        "_outer_exc_counts",
+        "_found_logfunc_call",
+        "_logger_name",
+        "_current_function",
+        "_function_stack",
+        "_scope_prefixes",
+        "_handled_exceptions",
+        "_string_varnames",
+        "_postprocess",
+        "_raise_strict",
     )
 
     class LogFuncReplaceException(Exception):
         pass
 
+    def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+        # A file that never mentions a logfunc has no calls to replace
+        if self._source_lacks(self._prefilter_needles()):
+            return tree
+        return super().transform_module_impl(tree)
+
+    def _prefilter_needles(self) -> Iterable[bytes]:
+        return (name.encode() for name in self._logfuncs)
+
+    def _locate(self, node: cst.CSTNode, msg: str) -> str:
+        pos = self.get_lazy_metadata(meta.PositionProvider, node).start
+        return f"{msg} :: line {pos.line}, column {pos.column}"
+
     def warn_at_node(self, node: cst.CSTNode, msg: str) -> None:
-        pos = self.get_metadata(cst.metadata.PositionProvider, node).start
-        self.warn(f"{msg} :: line {pos.line}, column {pos.column}")
+        self.warn(self._locate(node, msg))
 
     def raise_at_node(self, node: cst.CSTNode, msg: str) -> None:
-        pos = self.get_metadata(cst.metadata.PositionProvider, node).start
-        raise self.LogFuncReplaceException(
-            f"{msg} :: line {pos.line}, column {pos.column}"
-        )
+        raise self.LogFuncReplaceException(self._locate(node, msg))
 
     @staticmethod
     def add_args(parser: argparse.ArgumentParser) -> None:
@@ -195,15 +328,18 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
     @staticmethod
     def replace_logfunc(context: mod.CodemodContext, name: str) -> None:
         """Schedule a designated custom log function for replacement."""
-        context.scratch.setdefault(ReplaceFuncWithLoggerCommand.CONTEXT_KEY, set()).add(
-            name
+        ReplaceFuncWithLoggerCommand._get_logger_funcnames_from_context(context).add(
+            sys.intern(name)
         )
 
     @staticmethod
     def _get_logger_funcnames_from_context(context: mod.CodemodContext) -> Set[str]:
-        return context.scratch.setdefault(
-            ReplaceFuncWithLoggerCommand.CONTEXT_KEY, set()
-        )
+        # Unlike setdefault, only allocate a set when the key is missing, and
+        # probe the dict once when it is present
+        names = context.scratch.get(ReplaceFuncWithLoggerCommand.CONTEXT_KEY)
+        if names is None:
+            names = context.scratch[ReplaceFuncWithLoggerCommand.CONTEXT_KEY] = set()
+        return names
 
     def __init__(
         self,
@@ -219,24 +355,48 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
             logger_name: name of logger object to use in replacement
         """
         super().__init__(context)
-        self._logfuncs = self._get_logger_funcnames_from_context(context).union(
-            set(logfuncs)
+        # Membership is tested for every call in the module, so snapshot the
+        # names into a frozenset of interned strings
+        self._logfuncs = frozenset(
+            sys.intern(name)
+            for names in (
+                context.scratch.get(ReplaceFuncWithLoggerCommand.CONTEXT_KEY, ()),
+                logfuncs,
+            )
+            for name in names
         )
-        self._excs_in_logfunc_call = []
+        # Dotted names (from e.g. `import funcs.eprint`) are called as
+        # attributes; their last components let most method calls be rejected
+        # without building the full name of the callee
+        self._logfunc_attrs = _dotted_attrs(self._logfuncs)
+        # Exceptions referenced in the innermost logfunc call being visited;
+        # the counts of the calls enclosing it are saved on the stack
+        self._excs_in_logfunc_call = 0
+        self._outer_exc_counts: List[int] = []
+        self._found_logfunc_call = False
         self._logger_name = logger_name
-        self._function_context = []
-        self._handled_exceptions = set()
+        # Only the innermost function is ever reported, so it is kept in its
+        # own slot; the stack just restores it on leaving nested functions
+        self._current_function = "Module"
+        self._function_stack: List[str] = []
+        self._scope_prefixes = [""]
+        self._handled_exceptions: Dict[str, int] = {}
         self._string_varnames = {}
         self._postprocess = set()
         self._raise_strict = raise_strict
 
+    def _add_logfunc(self, name: str) -> None:
+        """Replace calls to name as well, from the next call visited on."""
+        self._logfuncs = self._logfuncs | {sys.intern(name)}
+        self._logfunc_attrs = _dotted_attrs(self._logfuncs)
+
     def ensure_assigned_format_is_percent(self, node: cst.Name) -> None:
         if node.value in self._string_varnames:
             map = self._string_varnames[node.value]
             # map is None if no postprocessing is needed
             if map is None:
                 return
-            scope = self.get_metadata(meta.ScopeProvider, node)
+            scope = self.get_lazy_metadata(meta.ScopeProvider, node)
             while scope not in map:
                 parent = scope.parent
                 if scope is parent:
@@ -245,49 +405,62 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
                     )
             self._postprocess.add(map[scope])
 
-    def get_string_components(
-        self, node: Union[cst.Name, cst.Call, cst.SimpleString]
-    ) -> Optional[CSTString]:
-        """Check if the passed node is a str, str.format, or string ref."""
-        if m.matches(node, m.SimpleString()):
-            return CSTString(literal=literal_eval(node.value))
-        elif m.matches(node, m.Call(func=m.Attribute(attr=m.Name("format")))):
+    def _components_of_literal(self, node: cst.SimpleString) -> CSTString:
+        return CSTString(literal=evaluate_string_literal(node.value))
+
+    def _components_of_call(self, node: cst.Call) -> Optional[CSTString]:
+        func = node.func
+        if type(func) is cst.Attribute and func.attr.value == "format":
             ret = CSTString(format_args=node.args)
-            if m.matches(node.func.value, m.SimpleString()):
-                ret.literal = literal_eval(node.func.value.value)
-            elif (
-                m.matches(node.func.value, m.Name())
-                and node.func.value.value in self._string_varnames
-            ):
-                ret.name = node.func.value
+            caller = func.value
+            if isinstance(caller, cst.SimpleString):
+                ret.literal = evaluate_string_literal(caller.value)
+            elif isinstance(caller, cst.Name) and caller.value in self._string_varnames:
+                ret.name = caller
             return ret
-        elif m.matches(node, m.Call(func=m.Name("str"))):
+        elif type(func) is cst.Name and func.value == "str":
             return CSTString(computed_value=node)
-        elif m.matches(node, m.Name()) and node.value in self._string_varnames:
+        return None
+
+    def _components_of_name(self, node: cst.Name) -> Optional[CSTString]:
+        if node.value in self._string_varnames:
             return CSTString(name=node)
         return None
 
+    # Each kind of node that can hold a string is handled by its own method
+    _STRING_COMPONENT_HANDLERS = {
+        cst.SimpleString: _components_of_literal,
+        cst.Call: _components_of_call,
+        cst.Name: _components_of_name,
+    }
+
+    def get_string_components(
+        self, node: Union[cst.Name, cst.Call, cst.SimpleString]
+    ) -> Optional[CSTString]:
+        """Check if the passed node is a str, str.format, or string ref."""
+        handler = self._STRING_COMPONENT_HANDLERS.get(type(node))
+        return None if handler is None else handler(self, node)
+
     def get_logfunc_arguments(self, node: cst.Call) -> Tuple[str, CSTString, Exception]:
         """Get loglevel, message, and possible Exception instance from logfunc call."""
         loglevel, msg = None, None
         unrecognized = 0
         for arg in node.args:
-            if (comps := self.get_string_components(arg.value)) is not None:
+            value = arg.value
+            is_name = isinstance(value, cst.Name)
+            if is_name and value.value in FILE_ARG_NAMES:
+                self.warn_at_node(node, "File argument in logfunc call")
+            elif (comps := self.get_string_components(value)) is not None:
                 # arg is a string
                 if comps.literal in LOGLEVELS:
                     if loglevel is not None:
-                        self.raise_at_node("Multiple loglevels in logfunc call")
+                        self.raise_at_node(node, "Multiple loglevels in logfunc call")
                     loglevel = comps.literal
-                elif comps.name is not None and comps.name.value.lower() == "file":
-                    self.warn_at_node(node, "File argument in logfunc call")
                 elif msg is None:
                     msg = comps
                 else:
                     unrecognized += 1
-            elif (
-                m.matches(arg.value, m.Name())
-                and arg.value.value in self._handled_exceptions
-            ):
+            elif is_name and value.value in self._handled_exceptions:
                 # handled below
                 pass
             else:
@@ -300,10 +473,16 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
             self.raise_at_node(node, "Malformed logfunc call")
         return loglevel, msg
 
-    @m.visit(m.Module())
+    def leave_Module(self, original: cst.Module, updated: cst.Module) -> cst.Module:
+        # The logger is only defined alongside the `import logging` added for
+        # a replaced call
+        if self._found_logfunc_call:
+            self.check_global_scope_for_logger(original)
+        return self.postprocess_assignment_nodes(original, updated)
+
     def check_global_scope_for_logger(self, node: cst.Module) -> None:
         """Define logger at module scope, provided it's not already defined."""
-        global_scope = self.get_metadata(cst.metadata.ScopeProvider, node)
+        global_scope = self.get_lazy_metadata(meta.ScopeProvider, node)
         if self._logger_name in global_scope:
             if self._raise_strict:
                 raise self.LogFuncReplaceException(
@@ -319,13 +498,17 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
                 f"{self._logger_name} = logging.getLogger(__name__)",
             )
 
-    @m.leave(m.Module())
     def postprocess_assignment_nodes(
         self, module: cst.Module, updated: cst.Module
     ) -> cst.Module:
         def convert_format(node: cst.Assign) -> cst.Assign:
-            bracket_fmt = literal_eval(node.value.value)
-            percent_fmt = repr(bracket_fmt.replace("{}", "%s"))
+            bracket_fmt = evaluate_string_literal(node.value.value)
+            try:
+                percent_fmt = repr(_brace_to_percent(bracket_fmt)[0])
+            except ValueError:
+                self.raise_at_node(
+                    node, "Failed to convert format string to %-style format string"
+                )
             return node.with_changes(value=node.value.with_changes(value=percent_fmt))
 
         if self._postprocess:
@@ -333,150 +516,163 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
                 updated = updated.deep_replace(node, convert_format(node))
         return updated
 
-    @m.visit(m.FunctionDef())
-    def push_function_onto_context(self, node: cst.FunctionDef) -> None:
-        self._function_context.append(node)
+    def leave_Assign(self, original: cst.Assign, updated: cst.Assign) -> cst.Assign:
+        if len(original.targets) != 1 or not isinstance(
+            original.targets[0].target, cst.Name
+        ):
+            return updated
+        if isinstance(original.value, cst.SimpleString):
+            self.record_string_assignment(original, updated)
+        elif _is_format_call(original.value):
+            self.record_template_string_assignment(original, updated)
+        return updated
 
-    @m.leave(
-        m.Assign(
-            targets=[m.AssignTarget(target=m.Name()), m.ZeroOrMore(m.Name())],
-            value=m.SimpleString(),
-        )
-    )
-    def record_string_assignment(
-        self, node: cst.Assign, updated: cst.Assign
-    ) -> cst.Assign:
-        scope = self.get_metadata(meta.ScopeProvider, node.targets[0].target)
+    def record_string_assignment(self, node: cst.Assign, updated: cst.Assign) -> None:
+        scope = self.get_lazy_metadata(meta.ScopeProvider, node.targets[0].target)
         self._string_varnames.setdefault(node.targets[0].target.value, {})[
             scope
         ] = updated
-        return updated
 
-    @m.leave(
-        m.Assign(
-            targets=[m.AssignTarget(target=m.Name()), m.ZeroOrMore(m.Name())],
-            value=m.Call(func=m.Attribute(attr=m.Name(value="format"))),
-        )
-    )
     def record_template_string_assignment(
         self, node: cst.Assign, updated: cst.Assign
-    ) -> cst.Assign:
+    ) -> None:
         caller = node.value.func.value
-        if m.matches(caller, m.SimpleString()) or m.matches(
-            caller,
-            m.Name(value=m.MatchIfTrue(lambda value: value in self._string_varnames)),
+        if isinstance(caller, cst.SimpleString) or (
+            isinstance(caller, cst.Name) and caller.value in self._string_varnames
         ):
-            scope = self.get_metadata(meta.ScopeProvider, node.targets[0].target)
+            scope = self.get_lazy_metadata(meta.ScopeProvider, node.targets[0].target)
             # the string variable name has to be in self._string_varnames, but we associate it with None
             # to ensure that no format correction (postprocessing) occurs
             self._string_varnames.setdefault(node.targets[0].target.value, {})[
                 scope
             ] = None
+
+    def visit_ClassDef(self, node: cst.ClassDef) -> None:
+        self._scope_prefixes.append(f"{self._scope_prefixes[-1]}{node.name.value}.")
+
+    def leave_ClassDef(
+        self, original: cst.ClassDef, updated: cst.ClassDef
+    ) -> cst.ClassDef:
+        self._scope_prefixes.pop()
         return updated
 
-    @m.leave(m.FunctionDef())
-    def pop_function_context(
+    def visit_FunctionDef(self, node: cst.FunctionDef) -> None:
+        """Track the qualified name of the enclosing function."""
+        # Build names the same way as __qualname__, e.g. Cls.meth or
+        # func.<locals>.inner, without going through QualifiedNameProvider
+        qualname = f"{self._scope_prefixes[-1]}{node.name.value}"
+        self._function_stack.append(self._current_function)
+        self._current_function = qualname
+        self._scope_prefixes.append(f"{qualname}.<locals>.")
+
+    def leave_FunctionDef(
         self, original: cst.FunctionDef, updated: cst.FunctionDef
     ) -> cst.FunctionDef:
-        self._function_context.pop()
+        self._current_function = self._function_stack.pop()
+        self._scope_prefixes.pop()
         return updated
 
-    @m.visit(m.ExceptHandler(name=m.AsName()))
-    def push_named_exception(self, node: cst.ExceptHandler) -> None:
+    def visit_ExceptHandler(self, node: cst.ExceptHandler) -> None:
         """Track which identifiers refer to caught exceptions."""
         # ExeptHandler.name has type Optional[AsName]
         # AsName.name has type Name
         # Name.value has type str
-        exc_name = node.name.name.value
-        self._handled_exceptions.add(exc_name)
+        # Handlers nested inside one another may bind the same name, so keep
+        # a count per name rather than a plain set
+        if node.name is not None:
+            name = node.name.name.value
+            self._handled_exceptions[name] = self._handled_exceptions.get(name, 0) + 1
 
-    @m.leave(m.ExceptHandler(name=m.AsName()))
-    def pop_named_exception(
+    def leave_ExceptHandler(
         self, original: cst.ExceptHandler, updated: cst.ExceptHandler
     ) -> cst.ExceptHandler:
-        """Pop from self.exception_stack."""
-        exc_name = original.name.name.value
-        self._handled_exceptions.discard(exc_name)
+        """Stop tracking the identifier bound by this handler."""
+        if original.name is not None:
+            name = original.name.name.value
+            count = self._handled_exceptions.pop(name)
+            if count > 1:
+                self._handled_exceptions[name] = count - 1
         return updated
 
-    @m.call_if_inside(m.Call(func=m.Name()))
-    @m.visit(m.Arg(value=m.Name()))
-    def set_exc_context(self, node: cst.Arg) -> None:
-        if node.value.value in self._handled_exceptions:
-            if self._excs_in_logfunc_call:
-                self._excs_in_logfunc_call[-1] += 1
-
-    @m.visit(m.Call(func=m.Name()))
-    def enter_logfunc_context(self, node: cst.Call) -> None:
-        if node.func.value in self._logfuncs:
-            self._excs_in_logfunc_call.append(0)
+    def visit_Arg(self, node: cst.Arg) -> None:
+        # Count references to caught exceptions anywhere inside a logfunc
+        # call, including nested calls such as "{}".format(e)
+        if (
+            self._outer_exc_counts
+            and isinstance(node.value, cst.Name)
+            and node.value.value in self._handled_exceptions
+        ):
+            self._excs_in_logfunc_call += 1
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        # Nothing inside these nodes can be a logfunc call, an exception
+        # handler or a string assignment, so don't descend into them
+        if isinstance(node, _PRUNED_NODE_TYPES):
+            return False
+        return super().on_visit(node)
+
+    def is_logfunc_call(self, node: cst.Call) -> bool:
+        # Runs twice for every call in the module; an exact type check is the
+        # cheapest way to reject method calls before touching .value
+        func = node.func
+        if type(func) is cst.Name:
+            return func.value in self._logfuncs
+        return (
+            type(func) is cst.Attribute
+            and func.attr.value in self._logfunc_attrs
+            and get_full_name_for_node(func) in self._logfuncs
+        )
+
+    def visit_Call(self, node: cst.Call) -> None:
+        if self.is_logfunc_call(node):
+            self._outer_exc_counts.append(self._excs_in_logfunc_call)
+            self._excs_in_logfunc_call = 0
+            self._found_logfunc_call = True
             mod.visitors.AddImportsVisitor.add_needed_import(self.context, "logging")
 
-    @m.leave(m.Call(func=m.Name()))
+    def leave_Call(self, original: cst.Call, updated: cst.Call) -> cst.Call:
+        if self.is_logfunc_call(original):
+            return self.change_logfunc_to_logger(original, updated)
+        return updated
+
     def change_logfunc_to_logger(
         self, original: cst.Call, updated: cst.Call
     ) -> cst.Call:
         """Remove and replace eprint :obj:`libcst.Call` nodes."""
-        if original.func.value not in self._logfuncs:
-            return updated
+        excs_in_call = self._excs_in_logfunc_call
+        self._excs_in_logfunc_call = self._outer_exc_counts.pop()
+        return self._build_logger_call(original, updated, excs_in_call > 0)
+
+    def _build_logger_call(
+        self, original: cst.Call, updated: cst.Call, references_exception: bool
+    ) -> cst.Call:
         loglevel, msg = self.get_logfunc_arguments(original)
 
         # If any args inside the eprint call reference an exception, assume we
         # should replace the call with logger.exception(...)
-        if self._excs_in_logfunc_call.pop() > 0:
-            if self._function_context:
-                try:
-                    # The QualifiedNameProvider returns a set() of *possible*
-                    # qualified names, of which we only need one
-                    exc_scope = (
-                        self.get_metadata(
-                            cst.metadata.QualifiedNameProvider,
-                            self._function_context[-1],
-                        )
-                        .pop()
-                        .name
-                    )
-                except KeyError:
-                    # pop from an empty set
-                    self.warn_at_node(
-                        original,
-                        "Unable to find qualified name for function context of exception (QualifiedNameProvider returned empty set)",
-                    )
-                    exc_scope = "UNKNOWN"
-            else:
-                exc_scope = "Module"
-            msg = f"Error in function: {exc_scope}"
+        if references_exception:
             return updated.with_changes(
-                func=cst.Attribute(
-                    value=cst.Name(self._logger_name),
-                    attr=cst.Name("exception"),
-                ),
-                args=[
-                    cst.Arg(value=cst.SimpleString(f'"{msg}"')),
-                    cst.Arg(
-                        keyword=cst.Name("exc_info"),
-                        value=cst.Name(value="True"),
-                        equal=cst.AssignEqual(
-                            whitespace_before=cst.SimpleWhitespace(""),
-                            whitespace_after=cst.SimpleWhitespace(""),
-                        ),
-                    ),
-                ],
+                func=_logger_attr(self._logger_name, "exception"),
+                args=_exception_args(self._current_function),
             )
 
         if msg.format_args:
             if msg.name is not None:
                 self.ensure_assigned_format_is_percent(msg.name)
             else:
-                # Simpleminded, but Good Enough for this use case
-                msg.literal = msg.literal.replace("{}", "%s")
+                # Simpleminded, but Good Enough for this use case: only bare {}
+                # placeholders are converted, so the result is valid iff every
+                # argument has a {}
                 try:
-                    _ = msg.literal % tuple("string" for _ in msg.format_args)
-                except TypeError:
+                    literal, fields = _brace_to_percent(msg.literal)
+                except ValueError:
+                    fields = None
+                if fields != len(msg.format_args):
                     self.raise_at_node(
                         original,
                         "Failed to convert str.format() call to %-style format string",
                     )
+                msg.literal = literal
         fmt = (
             msg.name
             if msg.name is not None
@@ -486,9 +682,6 @@ class ReplaceFuncWithLoggerCommand(CodemodBase):
         )
 
         return updated.with_changes(
-            func=cst.Attribute(
-                value=cst.Name(value="logger"),
-                attr=cst.Name(loglevel.lower()),
-            ),
+            func=_logger_attr(self._logger_name, loglevel.lower()),
             args=[cst.Arg(value=fmt), *msg.format_args],
         )
@@ -1,11 +1,23 @@
 from .imports import *
+from ..utils.literals import evaluate_string_literal
 from .codemod_base import CodemodBase
 
 
 class ReplaceStringCommand(CodemodBase):
     """Taken from https://libcst.readthedocs.io/en/latest/codemods_tutorial.html."""
 
+    __slots__ = (
+        "string",
+        "const",
+        "const_module",
+        "_literals",
+        "_min_literal_length",
+        "_needle",
+        "_quoted",
+    )
+
     DESCRIPTION: str = "Convert raw strings to imported constants."
+    CONTEXT_KEY: str = "ReplaceStringCommand"
 
     @staticmethod
     def add_args(parser: argparse.ArgumentParser) -> None:
@@ -34,17 +46,64 @@ class ReplaceStringCommand(CodemodBase):
             required=True,
         )
 
-    def __init__(self, context: mod.CodemodContext, string: str, const: str) -> None:
+    def __init__(
+        self, context: mod.CodemodContext, string: str, const: str, module: str
+    ) -> None:
         super().__init__(context)
         self.string = string
         self.const = const
+        # Codemod.module is the module being transformed, so use another name
+        self.const_module = module
+        self._literals: Dict[str, Any] = {}
+        # A quoted literal is never shorter than its value plus two quotes
+        self._min_literal_length = len(string) + 2
+        # A string that needs no escaping is spelled out verbatim by the
+        # literals equal to it (barring gratuitous escape sequences), so files
+        # that don't contain it anywhere can be skipped without parsing them
+        if string.isascii() and string.isprintable() and not any(
+            c in string for c in "\\'\""
+        ):
+            self._needle: Optional[bytes] = string.encode()
+        else:
+            self._needle = None
+        # The usual spellings of the string as a single- or double-quoted
+        # literal, which can be matched without evaluating anything
+        escaped = string.replace("\\", "\\\\")
+        self._quoted = frozenset(
+            (
+                "'" + escaped.replace("'", "\\'") + "'",
+                '"' + escaped.replace('"', '\\"') + '"',
+            )
+        )
+
+    def transform_module_impl(self, tree: cst.Module) -> cst.Module:
+        if self._needle is not None and self._source_lacks((self._needle,)):
+            return tree
+        return super().transform_module_impl(tree)
+
+    def _evaluate_literal(self, value: str) -> Any:
+        """Evaluate a string literal, reusing the result for repeated literals."""
+        try:
+            return self._literals[value]
+        except KeyError:
+            evaluated = self._literals[value] = evaluate_string_literal(value)
+            return evaluated
 
     def leave_SimpleString(
         self, original: cst.SimpleString, updated: cst.SimpleString
     ) -> Union[cst.SimpleString, cst.Name]:
-        if literal_eval(updated.value) == self.string:
-            mod.AddImportsVisitor.add_needed_import(
-                self.context, self.module, self.const
+        value = updated.value
+        if len(value) < self._min_literal_length:
+            return updated
+        if value in self._quoted:
+            matched = True
+        elif self._needle is not None and self.string not in value:
+            return updated
+        else:
+            matched = self._evaluate_literal(value) == self.string
+        if matched:
+            mod.visitors.AddImportsVisitor.add_needed_import(
+                self.context, self.const_module, self.const
             )
             return cst.Name(self.const)
         return updated
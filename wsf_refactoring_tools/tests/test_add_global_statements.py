@@ -24,6 +24,8 @@ class TestAddGlobalStatement(CodemodTest):
         cls.logger_declaration = """
             logger = logging.getLogger(__name__)
             """
+        # The statement as passed to the codemod, normalized once for all tests
+        cls.logger_statement = dedent(cls.logger_declaration).strip()
         cls.print_statement = """
             print('hi there')
             """
@@ -36,7 +38,9 @@ class TestAddGlobalStatement(CodemodTest):
         self.TRANSFORM.AUTOCHAIN = False
 
     def get_context(self, *statements):
-        return CodemodContext(scratch={self.TRANSFORM.CONTEXT_KEY: set(statements)})
+        return CodemodContext(
+            scratch={self.TRANSFORM.CONTEXT_KEY: dict.fromkeys(statements)}
+        )
 
     def test_function_def(self) -> None:
         before = f"""
@@ -64,7 +68,7 @@ class TestAddGlobalStatement(CodemodTest):
             def foo(bar):
                 print(bar)
             """
-        self.assertCodemod(before, after, [dedent(self.logger_declaration).strip()])
+        self.assertCodemod(before, after, [self.logger_statement])
 
     def test_duplicate_statements(self) -> None:
         before = f"""
@@ -97,7 +101,48 @@ class TestAddGlobalStatement(CodemodTest):
             before,
             after,
             context_override=self.get_context(
-                dedent(self.logger_declaration).strip(),
-                dedent(self.logger_declaration).strip(),
+                self.logger_statement,
+                self.logger_statement,
             ),
         )
+
+    def test_statements_added_in_scheduled_order(self) -> None:
+        before = """
+            import logging
+            print('hi there')
+            """
+
+        after = """
+            import logging
+
+            logger = logging.getLogger(__name__)
+            logger.setLevel(logging.INFO)
+
+            print('hi there')
+            """
+
+        context = CodemodContext()
+        for statement in (
+            "logger = logging.getLogger(__name__)",
+            "logger.setLevel(logging.INFO)",
+            "logger = logging.getLogger(__name__)",
+        ):
+            self.TRANSFORM.add_global_statement(context, statement)
+        self.assertCodemod(before, after, context_override=context)
+
+    def test_module_docstring_kept_first(self) -> None:
+        before = f"""
+            \"\"\"Module docstring.\"\"\"
+            import logging
+            print('hi there')
+            """
+
+        after = f"""
+            \"\"\"Module docstring.\"\"\"
+            import logging
+
+            logger = logging.getLogger(__name__)
+
+            print('hi there')
+            """
+        self.assertCodemod(before, after, [self.logger_statement])
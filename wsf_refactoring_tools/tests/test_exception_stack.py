@@ -0,0 +1,20 @@
+from unittest import TestCase
+
+from ..utils.exception_stack import ExceptionStack
+
+
+class TestExceptionStack(TestCase):
+    def test_all_tasks_run_before_raising(self) -> None:
+        results = []
+        with self.assertRaises(ExceptionGroup) as cm:
+            with ExceptionStack().map(int, [("1",), ("x",), ("3",)]) as values:
+                results.extend(values)
+        self.assertEqual(results, [1, None, 3])
+        [exc] = cm.exception.exceptions
+        self.assertIsInstance(exc, ValueError)
+        self.assertIn("task index 1", exc.__notes__[0])
+
+    def test_tasks_consumed_by_join(self) -> None:
+        stack = ExceptionStack([lambda: 1]).map(str, [(2,)])
+        self.assertEqual(stack.join(), [1, "2"])
+        self.assertEqual(stack.join(), [])
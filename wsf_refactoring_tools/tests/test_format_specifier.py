@@ -0,0 +1,37 @@
+from unittest import TestCase
+
+from ..utils.format_specifier import (
+    BraceFormatSpecifier,
+    FormatSpecifier,
+    PercentFormatSpecifier,
+)
+
+
+class TestFormatSpecifier(TestCase):
+    CONVERSIONS = [
+        ("{x:>10.3f}", "{x:>-10.3f}", "%(x)10.3f"),
+        ("{!r}", "{!r:>-s}", "%r"),
+        ("{:d}", "{:>-d}", "%d"),
+        ("{:+08.2f}", "{:>+08.2f}", "%+08.2f"),
+        ("{:x}", "{:>-x}", "%x"),
+        ("{:>5d}", "{:>-5d}", "%5d"),
+    ]
+
+    def test_brace_format_conversions(self) -> None:
+        for fmt, brace, percent in self.CONVERSIONS:
+            with self.subTest(fmt=fmt):
+                [spec] = BraceFormatSpecifier.from_format_string(fmt)
+                self.assertIsInstance(spec, FormatSpecifier)
+                self.assertEqual(str(BraceFormatSpecifier.from_spec(spec)), brace)
+                self.assertEqual(str(PercentFormatSpecifier.from_spec(spec)), percent)
+
+    def test_invalid_type_for_style_raises(self) -> None:
+        [spec] = BraceFormatSpecifier.from_format_string("{:n}")
+        with self.assertRaises(ExceptionGroup):
+            PercentFormatSpecifier.from_spec(spec)
+
+    def test_unrenderable_option_raises_on_construction(self) -> None:
+        [spec] = BraceFormatSpecifier.from_format_string("{:^10d}")
+        self.assertEqual(str(BraceFormatSpecifier.from_spec(spec)), "{:^-10d}")
+        with self.assertRaises(ExceptionGroup):
+            PercentFormatSpecifier.from_spec(spec)
@@ -0,0 +1,25 @@
+from ast import literal_eval
+from unittest import TestCase
+
+from ..utils.literals import evaluate_string_literal
+
+
+class TestEvaluateStringLiteral(TestCase):
+    def test_agrees_with_literal_eval(self) -> None:
+        literals = [
+            '""',
+            "''",
+            '"foo"',
+            "'it is'",
+            '"""foo"""',
+            "''''''",
+            'b"foo"',
+            'r"\\d+"',
+            '"foo\\nbar"',
+            "'{}'",
+        ]
+        for literal in literals:
+            with self.subTest(literal=literal):
+                self.assertEqual(
+                    evaluate_string_literal(literal), literal_eval(literal)
+                )
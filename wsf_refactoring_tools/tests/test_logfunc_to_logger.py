@@ -0,0 +1,160 @@
+from . import *
+
+
+class TestLogfuncToLoggerCommand(CodemodTest):
+    TRANSFORM = LogfuncToLoggerCommand
+
+    def test_def_and_calls_replaced(self) -> None:
+        before = """
+            import os
+
+            def eprint(msg, file, level):
+                print("{}::{}::{}".format(level, file, msg))
+
+            eprint("{} is {}".format("foo", bar), "INFO")
+            """
+
+        after = """
+            import os
+            import logging
+
+            logger = logging.getLogger(__name__)
+
+            logger.info('%s is %s', "foo", bar)
+            """
+
+        self.assertCodemod(before, after)
+
+    def test_import_alias_replaced(self) -> None:
+        before = """
+            from funcs import eprint as printe
+
+            printe("foobar", "DEBUG")
+            """
+
+        after = """
+            import logging
+
+            logger = logging.getLogger(__name__)
+
+            logger.debug('foobar')
+            """
+
+        self.assertCodemod(before, after)
+
+    def test_unbound_calls_unchanged(self) -> None:
+        before = """
+            from utils import *
+
+            eprint("foobar", "INFO")
+            """
+
+        self.assertCodemod(before, before)
+
+    def test_dotted_import_replaced(self) -> None:
+        before = """
+            import funcs.eprint
+
+            funcs.eprint("foobar", "INFO")
+            """
+
+        after = """
+            import logging
+
+            logger = logging.getLogger(__name__)
+
+            logger.info('foobar')
+            """
+
+        self.assertCodemod(before, after)
+
+    def test_import_without_calls_removed(self) -> None:
+        before = """
+            import os
+            from funcs import eprint
+
+            os.getcwd()
+            """
+
+        after = """
+            import os
+
+            os.getcwd()
+            """
+
+        self.assertCodemod(before, after)
+
+    def test_exception_logged_with_custom_logger(self) -> None:
+        before = """
+            from funcs import eprint
+
+            def f():
+                try:
+                    g()
+                except ValueError as e:
+                    eprint("Failed: {}".format(e), "ERROR")
+            """
+
+        after = """
+            import logging
+
+            log = logging.getLogger(__name__)
+
+            def f():
+                try:
+                    g()
+                except ValueError as e:
+                    log.exception("Error in function: f", exc_info=True)
+            """
+
+        self.assertCodemod(before, after, logger_name="log")
+
+    def test_alias_called_before_import_replaced(self) -> None:
+        before = """
+            def f():
+                printe("first", "INFO")
+
+            from funcs import eprint as printe
+
+            printe("second", "DEBUG")
+            """
+
+        after = """
+            import logging
+
+            logger = logging.getLogger(__name__)
+
+            def f():
+                logger.info('first')
+
+            logger.debug('second')
+            """
+
+        self.assertCodemod(before, after)
+
+    def test_exception_logged_before_import(self) -> None:
+        before = """
+            def f():
+                try:
+                    g()
+                except ValueError as e:
+                    printe("Failed: {}".format(e), "ERROR")
+                printe("{} done".format(g), "INFO")
+
+            from funcs import eprint as printe
+            """
+
+        after = """
+            import logging
+
+            logger = logging.getLogger(__name__)
+
+            def f():
+                try:
+                    g()
+                except ValueError as e:
+                    logger.exception("Error in function: f", exc_info=True)
+                logger.info('%s done', g)
+            """
+
+        self.assertCodemod(before, after)
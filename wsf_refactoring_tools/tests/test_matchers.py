@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+import libcst as cst
+import libcst.matchers as m
+
+from ..utils.matchers import LogFunctionCall, split_logfunc_args
+
+
+class TestLogfuncMatchers(TestCase):
+    def test_log_function_call_matched(self) -> None:
+        for code, expected in [
+            ('eprint("{}".format(x), "INFO")', True),
+            ("eprint('message', x, 'WARNING')", True),
+            ('eprint("message", "Info")', False),
+            ('eprint(message, "DEBUG")', False),
+        ]:
+            with self.subTest(code=code):
+                node = cst.parse_expression(code)
+                self.assertEqual(m.matches(node, LogFunctionCall()), expected)
+
+    def test_split_logfunc_args(self) -> None:
+        node = cst.parse_expression('eprint("{}".format(x), y, "ERROR", file)')
+        fmt, loglevel, filename, unmatched = split_logfunc_args(node)
+        self.assertIs(fmt, node.args[0])
+        self.assertIs(loglevel, node.args[2])
+        self.assertIs(filename, node.args[3])
+        self.assertEqual(unmatched, [node.args[1]])
+
+    def test_split_logfunc_args_rejects_duplicates(self) -> None:
+        node = cst.parse_expression('eprint("message", "INFO", "DEBUG")')
+        with self.assertRaises(ValueError):
+            split_logfunc_args(node)
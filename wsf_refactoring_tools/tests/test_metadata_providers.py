@@ -43,7 +43,7 @@ class TestStringInstanceOfProvider(TestCase):
     def visit_module(self, code: str) -> cst.Module:
         visitor = self.NamedStringVisitor()
         module = cst.parse_module(dedent(code).strip())
-        wrapper = cst.metadata.MetadataWrapper(module)
+        wrapper = cst.metadata.MetadataWrapper(module, unsafe_skip_copy=True)
         wrapper.visit(visitor)
         return wrapper, visitor
 
@@ -0,0 +1,63 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ..codemods import FileFailure, ReplaceStringCommand, run_parallel
+
+
+class TestRunParallel(TestCase):
+    def test_files_transformed_in_place(self) -> None:
+        sources = {
+            "match.py": 'print("hello world")\n',
+            "no_match.py": 'print("hello")\n',
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = []
+            for name, source in sources.items():
+                files.append(os.path.join(tmpdir, name))
+                with open(files[-1], "w") as f:
+                    f.write(source)
+
+            changed = run_parallel(
+                files,
+                ReplaceStringCommand,
+                max_workers=2,
+                string="hello world",
+                const="HELLO",
+                module="greetings",
+            )
+
+            self.assertEqual(changed, dict(zip(files, [True, False])))
+            with open(files[0]) as f:
+                self.assertEqual(
+                    f.read(), "from greetings import HELLO\n\nprint(HELLO)\n"
+                )
+            with open(files[1]) as f:
+                self.assertEqual(f.read(), sources["no_match.py"])
+
+    def test_failure_reported_per_file(self) -> None:
+        sources = {
+            "broken.py": 'print("hello world"\n',
+            "match.py": 'print("hello world")\n',
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = []
+            for name, source in sources.items():
+                files.append(os.path.join(tmpdir, name))
+                with open(files[-1], "w") as f:
+                    f.write(source)
+
+            changed = run_parallel(
+                files,
+                ReplaceStringCommand,
+                max_workers=2,
+                string="hello world",
+                const="HELLO",
+                module="greetings",
+            )
+
+            self.assertIsInstance(changed[files[0]], FileFailure)
+            self.assertIn("ParserSyntaxError", changed[files[0]].traceback_str)
+            self.assertIs(changed[files[1]], True)
+            with open(files[0]) as f:
+                self.assertEqual(f.read(), sources["broken.py"])
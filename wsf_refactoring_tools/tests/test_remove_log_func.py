@@ -22,87 +22,68 @@ class TestRemoveLogFuncDefAndImports(CodemodTest):
         self.TRANSFORM.AUTOCHAIN = False
 
     def test_simple_import(self) -> None:
-        before = dedent(
-            """
+        before = """
             import funcs.eprint as printe
 
             printe("hi there")
             """
-        ).strip()
 
-        after = dedent(
-            """
+        after = """
 
             printe("hi there")
             """
-        ).strip()
 
         self.assertCodemod(before, after)
 
     def test_import_group(self) -> None:
-        before = dedent(
-            """
+        before = """
             import fprint, gprint, eprint
             eprint("floop")
             """
-        ).strip()
 
-        after = dedent(
-            """
+        after = """
             import fprint, gprint
             eprint("floop")
             """
-        ).strip()
 
         self.assertCodemod(before, after)
 
     def test_importFrom_group(self) -> None:
-        before = dedent(
-            """
+        before = """
             from module import fprint, gprint, eprint
             eprint("floop")
             """
-        ).strip()
 
-        after = dedent(
-            """
+        after = """
             from module import fprint, gprint
             eprint("floop")
             """
-        ).strip()
 
         self.assertCodemod(before, after)
 
     def test_logfunc_def(self) -> None:
-        before = dedent(
-            f"""
+        before = f"""
             {self.eprint_def}
 
             eprint("foobar", __file__, "DEBUG")
             """
-        ).strip()
 
-        after = dedent(
-            f"""
+        after = f"""
             eprint("foobar", __file__, "DEBUG")
             """
-        )
 
         self.assertCodemod(before, after, expected_warnings=[])
 
     def test_logfunc_def_with_autochain(self) -> None:
         self.TRANSFORM.AUTOCHAIN = True
 
-        before = dedent(
-            f"""
+        before = f"""
             {self.eprint_def}
 
             eprint("foobar", __file__, "DEBUG")
             """
-        ).strip()
 
-        after = dedent(
-            """
+        after = """
             import logging
 
             logger = logging.getLogger(__name__)
@@ -110,7 +91,6 @@ class TestRemoveLogFuncDefAndImports(CodemodTest):
 
             logger.debug('foobar')
             """
-        )
 
         self.assertCodemod(
             before,
@@ -119,3 +99,22 @@ class TestRemoveLogFuncDefAndImports(CodemodTest):
                 "1 unrecognized argument(s) found in logfunc call :: line 3, column 0"
             ],
         )
+
+    def test_import_alias_scheduled_for_replacement(self) -> None:
+        before = """
+            from funcs import eprint as printe
+
+            printe("hi there")
+            """
+
+        after = """
+
+            printe("hi there")
+            """
+
+        context = CodemodContext()
+        self.assertCodemod(before, after, context_override=context)
+        self.assertSetEqual(
+            {"printe"},
+            context.scratch[ReplaceFuncWithLoggerCommand.CONTEXT_KEY],
+        )
@@ -1,6 +1,15 @@
+import tempfile
+from functools import lru_cache
+
 from . import *
 
 
+@lru_cache(maxsize=64)
+def _parse_fixture(code: str) -> cst.Module:
+    # Modules are immutable, so tests using the same fixture can share one
+    return cst.parse_module(dedent(code).strip())
+
+
 class TestReplaceFuncWithLoggerCommand(CodemodTest):
     TRANSFORM = ReplaceFuncWithLoggerCommand
 
@@ -30,46 +39,69 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
         self.TRANSFORM.AUTOCHAIN = False
 
     def get_scopes(self, before_code: str):
+        # Nothing modifies the module, so there is no need to copy it
         wrapper = cst.metadata.MetadataWrapper(
-            cst.parse_module(dedent(before_code).strip())
+            _parse_fixture(before_code), unsafe_skip_copy=True
         )
         return wrapper.module, wrapper.resolve(cst.metadata.ScopeProvider)
 
     def test_INFO(self) -> None:
-        before = dedent(
-            f"""
+        before = f"""
             {self.preamble}
             eprint({self.fmt}.format("foo", bar, qux), "INFO")
             """
-        ).strip()
 
-        after = dedent(
-            f"""
+        after = f"""
             {self.preamble}
             import logging
 
             {self.logger_name}.info({self.percent_fmt}, "foo", bar, qux)
             """
-        ).strip()
+
+        self.assertCodemod(
+            before, after, self.logger_name, context_override=self.context
+        )
+
+    def test_percent_sign_escaped(self) -> None:
+        before = """
+            eprint("{} is 100% done".format(task), "INFO")
+            """
+
+        after = f"""
+            import logging
+
+            {self.logger_name}.info('%s is 100%% done', task)
+            """
+
+        self.assertCodemod(
+            before, after, self.logger_name, context_override=self.context
+        )
+
+    def test_escaped_braces_unescaped(self) -> None:
+        before = """
+            eprint("{{{}}} is {{done}}".format(task), "INFO")
+            """
+
+        after = f"""
+            import logging
+
+            {self.logger_name}.info('{{%s}} is {{done}}', task)
+            """
 
         self.assertCodemod(
             before, after, self.logger_name, context_override=self.context
         )
 
     def test_malformed_logfunc_call(self) -> None:
-        before = dedent(
-            f"""
+        before = f"""
             eprint({self.fmt}.format("foo", bar, qux), x, __file__, "INFO")
             """
-        ).strip()
 
-        after = dedent(
-            f"""
+        after = f"""
             import logging
 
             {self.logger_name}.info({self.percent_fmt}, "foo", bar, qux)
             """
-        ).strip()
 
         self.assertCodemod(
             before,
@@ -82,18 +114,15 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
         )
 
     def test_exception_at_module_scope(self) -> None:
-        before = dedent(
-            f"""
+        before = f"""
             {self.preamble}
             try:
                 raise ValueError("oops")
             except ValueError as e:
                 eprint({self.error_fmt}.format(e), __file__, "INFO")
             """
-        ).strip()
 
-        after = dedent(
-            f"""
+        after = f"""
             {self.preamble}
             import logging
 
@@ -102,15 +131,68 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
             except ValueError as e:
                 logger.exception("Error in function: Module", exc_info=True)
             """
-        ).strip()
 
         self.assertCodemod(
             before, after, self.logger_name, context_override=self.context
         )
 
+    def test_exception_in_nested_logfunc_call(self) -> None:
+        before = f"""
+            {self.preamble}
+            try:
+                raise ValueError("oops")
+            except ValueError as e:
+                eprint("Retrying", eprint({self.error_fmt}.format(e), "ERROR"), "INFO")
+            """
+
+        after = f"""
+            {self.preamble}
+            import logging
+
+            try:
+                raise ValueError("oops")
+            except ValueError as e:
+                logger.info('Retrying')
+            """
+
+        self.assertCodemod(
+            before,
+            after,
+            self.logger_name,
+            context_override=self.context,
+            expected_warnings=[
+                "1 unrecognized argument(s) found in logfunc call :: line 5, column 4",
+            ],
+        )
+
+    def test_replacements_share_no_nodes(self) -> None:
+        # Metadata is keyed by node identity, so a chained codemod can only
+        # skip copying its input if no node object occurs twice in it
+        before = f"""
+            try:
+                raise ValueError("oops")
+            except ValueError as e:
+                eprint({self.error_fmt}.format(e), "ERROR")
+                eprint({self.error_fmt}.format(e), "ERROR")
+            eprint("first", "INFO")
+            eprint("second", "INFO")
+            """
+        command = self.TRANSFORM(self.context)
+        with command._handle_metadata_reference(_parse_fixture(before)) as tree:
+            updated = command.transform_module_impl(tree)
+
+        nodes = []
+
+        class Collector(cst.CSTVisitor):
+            def on_visit(self, node: cst.CSTNode) -> bool:
+                nodes.append(node)
+                return True
+
+        updated.visit(Collector())
+        self.assertEqual(len(nodes), len({id(node) for node in nodes}))
+
     def test_exception_with_function_scope(self) -> None:
-        before = dedent(
-            f"""
+        before = f"""
             {self.preamble}
 
             def foo(bar: int) -> int:
@@ -119,10 +201,8 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
                 except ZeroDivisionError as e:
                     eprint({self.error_fmt}.format(e), __file__, "INFO")
             """
-        ).strip()
 
-        after = dedent(
-            f"""
+        after = f"""
             {self.preamble}
             import logging
 
@@ -132,15 +212,13 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
                 except ZeroDivisionError as e:
                     logger.exception("Error in function: foo", exc_info=True)
             """
-        )
 
         self.assertCodemod(
             before, after, self.logger_name, context_override=self.context
         )
 
     def test_exception_function_scope_nested_exceptions(self) -> None:
-        before = dedent(
-            f"""
+        before = f"""
             {self.preamble}
             def foo(bar):
                 try:
@@ -152,10 +230,8 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
                 except Exception:
                     eprint("outer exception", "ERROR")
             """
-        ).strip()
 
-        after = dedent(
-            f"""
+        after = f"""
             {self.preamble}
             import logging
 
@@ -169,7 +245,66 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
                 except Exception:
                     logger.error('outer exception')
             """
+        self.assertCodemod(
+            before, after, self.logger_name, context_override=self.context
         )
+
+    def test_exception_in_method(self) -> None:
+        before = f"""
+            {self.preamble}
+            class Foo:
+                def bar(self):
+                    def qux():
+                        try:
+                            pass
+                        except ValueError as e:
+                            eprint({self.error_fmt}.format(e), "INFO")
+            """
+
+        after = f"""
+            {self.preamble}
+            import logging
+
+            class Foo:
+                def bar(self):
+                    def qux():
+                        try:
+                            pass
+                        except ValueError as e:
+                            logger.exception("Error in function: Foo.bar.<locals>.qux", exc_info=True)
+            """
+        self.assertCodemod(
+            before, after, self.logger_name, context_override=self.context
+        )
+
+    def test_nested_handlers_binding_same_name(self) -> None:
+        before = f"""
+            {self.preamble}
+            def foo(bar):
+                try:
+                    raise ValueError("oops")
+                except ValueError as e:
+                    try:
+                        print(e)
+                    except Exception as e:
+                        pass
+                    eprint({self.error_fmt}.format(e), "INFO")
+            """
+
+        after = f"""
+            {self.preamble}
+            import logging
+
+            def foo(bar):
+                try:
+                    raise ValueError("oops")
+                except ValueError as e:
+                    try:
+                        print(e)
+                    except Exception as e:
+                        pass
+                    logger.exception("Error in function: foo", exc_info=True)
+            """
         self.assertCodemod(
             before, after, self.logger_name, context_override=self.context
         )
@@ -184,6 +319,16 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
                 before, "", self.logger_name, context_override=self.context
             )
 
+    def test_placeholder_count_mismatch_raises(self) -> None:
+        before = """
+            eprint("{} is {}".format("foo"), "INFO")
+            """
+
+        with self.assertRaises(self.TRANSFORM.LogFuncReplaceException):
+            self.assertCodemod(
+                before, "", self.logger_name, context_override=self.context
+            )
+
     def test_variable_format_postprocessed(self) -> None:
         before = f"""
             msg = {self.fmt}
@@ -245,3 +390,79 @@ class TestReplaceFuncWithLoggerCommand(CodemodTest):
         self.assertCodemod(
             before, after, self.logger_name, context_override=self.context
         )
+
+    def test_file_argument_recognized(self) -> None:
+        before = f"""
+            eprint("foobar", file, "INFO")
+            """
+
+        after = f"""
+            import logging
+
+            {self.logger_name}.info('foobar')
+            """
+
+        self.assertCodemod(
+            before,
+            after,
+            self.logger_name,
+            context_override=self.context,
+            expected_warnings=["File argument in logfunc call :: line 1, column 0"],
+        )
+
+    def test_multiple_loglevels_raises(self) -> None:
+        before = """
+            eprint("foobar", "INFO", "DEBUG")
+            """
+
+        with self.assertRaises(self.TRANSFORM.LogFuncReplaceException):
+            self.assertCodemod(
+                before, "", self.logger_name, context_override=self.context
+            )
+
+    def test_annotated_function(self) -> None:
+        before = """
+            def foo(bar: int = 1) -> "List[int]":
+                eprint("foobar", "DEBUG")
+            """
+
+        after = f"""
+            import logging
+
+            def foo(bar: int = 1) -> "List[int]":
+                {self.logger_name}.debug('foobar')
+            """
+
+        self.assertCodemod(
+            before, after, self.logger_name, context_override=self.context
+        )
+
+    def test_custom_logger_name(self) -> None:
+        before = """
+            eprint("foobar", "DEBUG")
+            """
+
+        after = """
+            import logging
+
+            log.debug('foobar')
+            """
+
+        self.assertCodemod(before, after, "log", context_override=self.context)
+
+    def test_file_without_logfunc_skipped(self) -> None:
+        before = """
+            eprint("foobar", "DEBUG")
+            """
+
+        with tempfile.NamedTemporaryFile("w", suffix=".py") as f:
+            f.write('print("foobar")\n')
+            f.flush()
+            self.assertCodemod(
+                before,
+                before,
+                self.logger_name,
+                context_override=CodemodContext(
+                    filename=f.name, scratch=self.context.scratch
+                ),
+            )
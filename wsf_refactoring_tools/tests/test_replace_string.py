@@ -0,0 +1,82 @@
+import tempfile
+
+from . import *
+
+
+class TestReplaceStringCommand(CodemodTest):
+    TRANSFORM = ReplaceStringCommand
+
+    @classmethod
+    def setUpClass(cls):
+        cls.TRANSFORM.AUTOCHAIN = False
+
+    def setUp(self) -> None:
+        self.TRANSFORM.AUTOCHAIN = False
+
+    def test_string_replaced_with_constant(self) -> None:
+        before = """
+            print("hello world")
+            print('hello world', "goodbye")
+            """
+
+        after = """
+            from greetings import HELLO
+
+            print(HELLO)
+            print(HELLO, "goodbye")
+            """
+
+        self.assertCodemod(
+            before, after, string="hello world", const="HELLO", module="greetings"
+        )
+
+    def test_string_with_quotes_replaced(self) -> None:
+        before = """
+            print("it's", 'it\\'s', r"it's")
+            """
+
+        after = """
+            from greetings import ITS
+
+            print(ITS, ITS, ITS)
+            """
+
+        self.assertCodemod(
+            before, after, string="it's", const="ITS", module="greetings"
+        )
+
+    def test_no_match_unchanged(self) -> None:
+        before = """
+            print("hello")
+            """
+
+        self.assertCodemod(
+            before, before, string="hello world", const="HELLO", module="greetings"
+        )
+
+    def test_file_without_string_skipped(self) -> None:
+        before = """
+            print("hello world")
+            """
+
+        with tempfile.NamedTemporaryFile("w", suffix=".py") as f:
+            f.write('print("hello")\n')
+            f.flush()
+            self.assertCodemod(
+                before,
+                before,
+                string="hello world",
+                const="HELLO",
+                module="greetings",
+                context_override=CodemodContext(filename=f.name),
+            )
+
+    def test_scheduled_without_arguments_skipped(self) -> None:
+        context = CodemodContext(scratch={ReplaceStringCommand.CONTEXT_KEY: {}})
+        module = cst.parse_module('print("hello world")\n')
+        chained = AddGlobalStatements(context)
+        chained.AUTOCHAIN = True
+
+        self.assertEqual(chained.transform_module(module).code, module.code)
+        self.assertNotIn(ReplaceStringCommand.CONTEXT_KEY, context.scratch)
+        self.assertEqual(len(context.warnings), 1)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-from collections import deque
 from contextlib import AbstractContextManager
 from functools import partial
-from typing import Any, Callable, List, Tuple
+from typing import Any, Callable, List, Optional, Tuple
 
 
 class ExceptionStack(AbstractContextManager):
@@ -17,14 +16,14 @@ class ExceptionStack(AbstractContextManager):
         resolve: combine cached exceptions into an ExceptionGroup and raise
     """
 
-    def __init__(self, tasks: List[Callable[[], Any]] = []) -> None:
+    def __init__(self, tasks: Optional[List[Callable[[], Any]]] = None) -> None:
         """ExceptionGroup constructor.
 
         Args:
             tasks: list of callables to be executed (additional tasks can be
                 added after initialization)
         """
-        self.tasks = deque(tasks)
+        self.tasks = list(tasks) if tasks is not None else []
         self.exceptions = []
 
     def join(self) -> List[Any]:
@@ -51,8 +50,7 @@ class ExceptionStack(AbstractContextManager):
             list of values returned by tasks in self.tasks
         """
         results = []
-        while self.tasks:
-            task = self.tasks.popleft()
+        for task in self.tasks:
             try:
                 results.append(task())
             except Exception as e:
@@ -61,6 +59,7 @@ class ExceptionStack(AbstractContextManager):
                 )
                 self.exceptions.append(e)
                 results.append(None)
+        self.tasks.clear()
         return results
 
     def resolve(self) -> None:
@@ -87,7 +86,7 @@ class ExceptionStack(AbstractContextManager):
         Returns:
             self (to allow method-chaining)
         """
-        self.tasks.extend([partial(func, *a) for a in args])
+        self.tasks.extend(partial(func, *a) for a in args)
         return self
 
     def __enter__(self):
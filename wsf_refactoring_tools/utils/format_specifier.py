@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import dataclasses
 import string
-from typing import List, Literal, Optional, TypeVar, Union
-
-from .exception_stack import ExceptionStack
+import sys
+from functools import lru_cache
+from typing import Callable, List, Literal, Optional, Tuple, TypeVar, Union
 
 NUMERIC_TYPES = {
     "decimal": "d",
@@ -33,8 +33,12 @@ NONNUMERIC_TYPES = {
 
 NONNUMERIC_TYPES_INV = {v: k for k, v in NONNUMERIC_TYPES.items()}
 
+# Merged once here rather than on every lookup
+ALL_TYPES = NUMERIC_TYPES | NONNUMERIC_TYPES
+ALL_TYPES_INV = NUMERIC_TYPES_INV | NONNUMERIC_TYPES_INV
+
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class NumericFormat:
     alternate_form: bool = False
     pad_zeros: bool = False
@@ -47,19 +51,36 @@ class NumericFormat:
     precision: Optional[int] = None
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class AlignmentFormat:
     justify: Literal["left", "right", "center"] = "right"
     fill: Optional[str] = None
     width: Optional[int] = None
 
 
+@lru_cache(maxsize=4096)
+def _parse_brace_fields(
+    fmt: str,
+) -> Tuple[Tuple[str, Optional[str], Optional[str], Optional[str]], ...]:
+    """Split a brace-style format string, reusing results for repeated strings."""
+    return tuple(string._string.formatter_parser(fmt))
+
+
 NumericType: TypeVar = Literal[*NUMERIC_TYPES]
 NonnumericType: TypeVar = Literal[*NONNUMERIC_TYPES]
 TypeFormat: TypeVar = Union[NumericType, NonnumericType]
 
 
 class FormatSpecifier:
+    __slots__ = ("alignmentFormat", "numericFormat", "typeFormat", "fieldName")
+
+    # The validate_* methods of each class, collected once when it is defined
+    _validators: Tuple[Callable[[FormatSpecifier], None], ...] = ()
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._validators = _collect_validators(cls)
+
     def __init__(
         self,
         alignmentFormat: AlignmentFormat,
@@ -69,8 +90,10 @@ class FormatSpecifier:
     ) -> None:
         self.alignmentFormat = alignmentFormat
         self.numericFormat = numericFormat
-        self.typeFormat = typeFormat
-        self.fieldName = fieldName
+        # Interned, since these are used as keys in the type tables and the
+        # render caches, often with equal strings from separate parses
+        self.typeFormat = sys.intern(typeFormat)
+        self.fieldName = sys.intern(fieldName) if fieldName else fieldName
         self.validate()
 
     def validate_typeFormat(self):
@@ -84,13 +107,19 @@ class FormatSpecifier:
             ), f"Invalid type format '{self.typeFormat}'"
 
     def validate(self) -> None:
-        validation_methods = [
-            attr
-            for name in dir(self)
-            if callable(attr := getattr(self, name)) and name.startswith("validate_")
-        ]
-        with ExceptionStack(validation_methods):
-            pass
+        """Run every validate_* method, raising all failures as one group.
+
+        Validation normally succeeds, so exceptions are only collected when
+        one is actually raised, without setting up an ExceptionStack.
+        """
+        exceptions = []
+        for validator in self._validators:
+            try:
+                validator(self)
+            except Exception as e:
+                exceptions.append(e)
+        if exceptions:
+            raise ExceptionGroup("Invalid format specifier", exceptions)
 
     @classmethod
     def from_spec(cls, specifier: FormatSpecifier):
@@ -103,13 +132,26 @@ class FormatSpecifier:
 
     @classmethod
     def from_text_fields(cls, fields: List[Union[str, FormatSpecifier]]):
-        return "".join(list(map(str, fields)))
+        return "".join(map(str, fields))
 
     def __repr__(self):
         return f"FormatSpecifier(alignment: {self.alignmentFormat}, numeric: {self.numericFormat}, type: {self.typeFormat}, field: {self.fieldName})"
 
 
+def _collect_validators(cls: type) -> Tuple[Callable[[FormatSpecifier], None], ...]:
+    return tuple(
+        attr
+        for name in dir(cls)
+        if name.startswith("validate_") and callable(attr := getattr(cls, name))
+    )
+
+
+FormatSpecifier._validators = _collect_validators(FormatSpecifier)
+
+
 class PercentFormatSpecifier(FormatSpecifier):
+    __slots__ = ()
+
     JUSTIFY = {
         "left": "-",
         "right": "",
@@ -117,32 +159,66 @@ class PercentFormatSpecifier(FormatSpecifier):
 
     SIGN = {"sign_positive": "+", "nosign_positive": "", "align_positive": " "}
 
-    TYPE_UNDEF = ["decimal_localized", "percentage", "binary"]
+    TYPE_UNDEF = frozenset(("decimal_localized", "percentage", "binary"))
 
     def validate_type_defined(self):
         assert (
             self.typeFormat not in self.TYPE_UNDEF
         ), f"Type '{self.typeFormat}' not defined for percent-style format specifiers"
 
+    def validate_justify(self):
+        # Checked up front so that rendering is pure table lookups
+        justify = self.alignmentFormat.justify
+        assert (
+            justify in self.JUSTIFY
+        ), f"Justification '{justify}' not defined for percent-style format specifiers"
+
     def __str__(self):
-        fmt = self.SIGN[self.numericFormat.sign]
-        fmt += self.JUSTIFY[self.alignmentFormat.justify]
-        if self.numericFormat.pad_zeros:
-            fmt += "0"
-        if self.numericFormat.alternate_form:
-            fmt += "#"
-        if self.alignmentFormat.width:
-            fmt += str(self.alignmentFormat.width)
-        if self.numericFormat.precision:
-            fmt += f".{self.numericFormat.precision}"
-        fmt += (NUMERIC_TYPES | NONNUMERIC_TYPES).get(self.typeFormat)
-        field_spec = "%"
-        if field := self.fieldName:
-            field_spec += f"({field})"
-        return f"{field_spec}{fmt}"
+        num, align = self.numericFormat, self.alignmentFormat
+        return self._render(
+            num.sign,
+            align.justify,
+            num.pad_zeros,
+            num.alternate_form,
+            align.width,
+            num.precision,
+            self.typeFormat,
+            self.fieldName,
+        )
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _render(
+        cls,
+        sign,
+        justify,
+        pad_zeros,
+        alternate_form,
+        width,
+        precision,
+        typeFormat,
+        fieldName,
+    ) -> str:
+        """Render a specifier from its fields, reusing repeated renderings."""
+        parts = ["%"]
+        if fieldName:
+            parts += ("(", fieldName, ")")
+        parts += (cls.SIGN[sign], cls.JUSTIFY[justify])
+        if pad_zeros:
+            parts.append("0")
+        if alternate_form:
+            parts.append("#")
+        if width:
+            parts.append(str(width))
+        if precision:
+            parts += (".", str(precision))
+        parts.append(ALL_TYPES[typeFormat])
+        return "".join(parts)
 
 
 class BraceFormatSpecifier(FormatSpecifier):
+    __slots__ = ()
+
     JUSTIFY = {
         "left": "<",
         "right": ">",
@@ -157,7 +233,14 @@ class BraceFormatSpecifier(FormatSpecifier):
 
     GROUP = {"comma": ",", "underscore": "_"}
 
-    TYPE_UNDEF = ["char"]
+    # (conversion, closing type code) for each type, so rendering needs a
+    # single lookup instead of branching on the kind of type
+    CONVERSION = {
+        **{name: ("!" + code, "s}") for name, code in NONNUMERIC_TYPES.items()},
+        **{name: ("", code + "}") for name, code in NUMERIC_TYPES.items()},
+    }
+
+    TYPE_UNDEF = frozenset(("char",))
 
     def validate_type_defined(self):
         assert (
@@ -168,32 +251,70 @@ class BraceFormatSpecifier(FormatSpecifier):
         if self.typeFormat == "decimal_localized":
             assert (
                 self.numericFormat.group is None
-            ), "Cannot specify a group separator with numeric type '{self.typeFormat}'"
+            ), f"Cannot specify a group separator with numeric type '{self.typeFormat}'"
+
+    def validate_options(self):
+        # Checked up front so that rendering is pure table lookups
+        num, align = self.numericFormat, self.alignmentFormat
+        assert align.justify in self.JUSTIFY, f"Invalid justification '{align.justify}'"
+        assert num.sign in self.SIGN, f"Invalid sign option '{num.sign}'"
+        assert (
+            num.group is None or num.group in self.GROUP
+        ), f"Invalid group separator '{num.group}'"
 
     def __str__(self):
-        fmt = self.JUSTIFY[self.alignmentFormat.justify]
-        fmt += self.SIGN[self.numericFormat.sign]
-        if fill := self.alignmentFormat.fill:
-            fmt = str(fill)[0] + fmt
-        if self.numericFormat.float_positive_zero:
-            fmt += "z"
-        if self.numericFormat.alternate_form:
-            fmt += "#"
-        if self.numericFormat.pad_zeros:
-            fmt += "0"
-        if width := self.alignmentFormat.width:
-            fmt += str(width)
-        if group := self.numericFormat.group:
-            fmt += self.GROUP[group]
-        if precision := self.numericFormat.precision:
-            fmt += f".{precision}"
-        if self.typeFormat in NONNUMERIC_TYPES:
-            fmt = f"!{NONNUMERIC_TYPES[self.typeFormat]}:{fmt}s"
-        else:
-            fmt = f":{fmt}{NUMERIC_TYPES[self.typeFormat]}"
-        if field := self.fieldName:
-            fmt = f"{field}{fmt}"
-        return "{" + fmt + "}"
+        num, align = self.numericFormat, self.alignmentFormat
+        return self._render(
+            align.justify,
+            num.sign,
+            align.fill,
+            num.float_positive_zero,
+            num.alternate_form,
+            num.pad_zeros,
+            align.width,
+            num.group,
+            num.precision,
+            self.typeFormat,
+            self.fieldName,
+        )
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _render(
+        cls,
+        justify,
+        sign,
+        fill,
+        float_positive_zero,
+        alternate_form,
+        pad_zeros,
+        width,
+        group,
+        precision,
+        typeFormat,
+        fieldName,
+    ) -> str:
+        """Render a specifier from its fields, reusing repeated renderings."""
+        conversion, type_code = cls.CONVERSION[typeFormat]
+        parts = ["{", fieldName or "", conversion, ":"]
+        if fill:
+            parts.append(str(fill)[0])
+        parts += (cls.JUSTIFY[justify], cls.SIGN[sign])
+        if float_positive_zero:
+            parts.append("z")
+        if alternate_form:
+            parts.append("#")
+        if pad_zeros:
+            parts.append("0")
+        if width:
+            parts.append(str(width))
+        if group:
+            parts.append(cls.GROUP[group])
+        if precision:
+            parts += (".", str(precision))
+        parts.append(type_code)
+        # One join builds the result without intermediate strings
+        return "".join(parts)
 
     @classmethod
     def _from_formatter_parser_field(cls, field: str):
@@ -207,7 +328,7 @@ class BraceFormatSpecifier(FormatSpecifier):
                 conv = spec[-1]
             else:
                 conv = "s"
-        typeName = (NUMERIC_TYPES_INV | NONNUMERIC_TYPES_INV)[conv]
+        typeName = ALL_TYPES_INV[conv]
         for k, v in cls.JUSTIFY.items():
             if v in spec:
                 align.justify = k
@@ -223,11 +344,12 @@ class BraceFormatSpecifier(FormatSpecifier):
             num.float_positive_zero = True
         if "#" in spec:
             num.alternate_form = True
-        if "." in spec:
-            num.precision = int(
-                "".join([c for c in spec[spec.find(".") :] if c.isnumeric()])
-            )
-        width = "".join([c for c in spec[: spec.find(".")] if c.isnumeric()])
+        # Split once; find() returns -1 without a ".", which used to cut the
+        # last character (often the width) off the spec
+        before_dot, dot, after_dot = spec.partition(".")
+        if dot:
+            num.precision = int("".join([c for c in after_dot if c.isnumeric()]))
+        width = "".join([c for c in before_dot if c.isnumeric()])
         if width.startswith("0"):
             num.pad_zeros = True
         if width:
@@ -236,5 +358,5 @@ class BraceFormatSpecifier(FormatSpecifier):
 
     @classmethod
     def from_format_string(cls, fmt: str) -> List[Union[str, FormatSpecifier]]:
-        fields = string._string.formatter_parser(fmt)
+        fields = _parse_brace_fields(fmt)
         return [cls._from_formatter_parser_field(field) for field in fields]
@@ -109,17 +109,19 @@ class _IsNameReferentInstanceOfProvider(BatchableMetadataProvider, Parameterized
     def __init__(self) -> None:
         super().__init__()
         self._registry = set()
+        # Resolve the bound matcher once, rather than once per assignment
+        self._value_matcher = self.matcher
 
     def visit_Name(self, node: cst.Name) -> None:
         self.set_metadata(node, node.value in self._registry)
 
     def visit_Assign(self, node: cst.Assign) -> None:
-        if m.matches(
-            node,
-            m.Assign(targets=[m.AssignTarget(target=m.Name()), m.ZeroOrMore(m.Name())]),
-        ):
-            if m.matches(node.value, self.matcher):
-                self._registry.add(node.targets[0].target.value)
+        # Only simple assignments to a single name are tracked.  Checking the
+        # node directly avoids building and running a matcher for every Assign.
+        targets = node.targets
+        if len(targets) == 1 and isinstance(target := targets[0].target, cst.Name):
+            if m.matches(node.value, self._value_matcher):
+                self._registry.add(target.value)
 
 
 IsNameReferentInstanceOfProvider = ParameterizedClassWrapper(
@@ -0,0 +1,20 @@
+from ast import literal_eval
+from typing import Any
+
+
+def evaluate_string_literal(value: str) -> Any:
+    """Evaluate the source of a string literal, e.g. SimpleString.value.
+
+    Plain single- or double-quoted literals without escapes evaluate to the
+    text between their quotes, so they are handled without literal_eval,
+    which has to parse the literal.  Anything else (prefixes, escape
+    sequences, triple quotes) falls back to literal_eval.
+    """
+    quote = value[0]
+    if (
+        (quote == '"' or quote == "'")
+        and (len(value) == 2 or value[1] != quote)
+        and "\\" not in value
+    ):
+        return value[1:-1]
+    return literal_eval(value)
@@ -1,24 +1,64 @@
-from ast import literal_eval
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import libcst as cst
 import libcst.matchers as m
 
+from .literals import evaluate_string_literal
 
-LOGLEVELS = ["DEBUG", "INFO", "WARN", "WARNING", "ERROR", "CRITICAL", "FATAL"]
+
+LOGLEVELS = frozenset(
+    ("DEBUG", "INFO", "WARN", "WARNING", "ERROR", "CRITICAL", "FATAL")
+)
+
+FILE_ARG_NAMES = frozenset(("file", "File"))
+
+
+_LOGLEVEL_INITIALS = frozenset(level[0] for level in LOGLEVELS)
+
+
+def _is_loglevel_literal(value: str, levels=LOGLEVELS) -> bool:
+    # SimpleString.value includes the quotes (and any prefix).  A plainly
+    # quoted string whose first character can't start a loglevel is rejected
+    # before anything is sliced or evaluated, which covers most strings, and
+    # plain literals are then compared by slicing off their quotes.
+    quote, first = value[0], value[1]
+    if quote in "'\"" and first != quote and first not in _LOGLEVEL_INITIALS:
+        return False
+    return evaluate_string_literal(value) in levels
+
+
+# Matchers are immutable, so each one is built once here and the factories
+# below hand out the shared instance.
+LOG_LEVEL_LITERAL = m.SimpleString(value=m.MatchIfTrue(_is_loglevel_literal))
+
+TEMPLATE_STRING = m.Call(
+    func=m.Attribute(value=m.SimpleString(), attr=m.Name(value="format"))
+)
+
+LOG_FUNCTION_CALL = m.Call(
+    func=m.Name(),
+    args=[
+        m.Arg(value=TEMPLATE_STRING | m.SimpleString()),
+        m.ZeroOrMore(),
+        m.Arg(value=LOG_LEVEL_LITERAL),
+        m.ZeroOrMore(),
+    ],
+)
+
+# Argument matchers used to classify the arguments of a log function call
+_LOGLEVEL_ARG = m.Arg(value=LOG_LEVEL_LITERAL)
+_TEMPLATE_ARG = m.Arg(value=TEMPLATE_STRING)
+_FILE_ARG = m.Arg(value=m.Name(value=m.MatchIfTrue(FILE_ARG_NAMES.__contains__)))
 
 
 def LogLevelLiteral():
     """Matcher factory for use with libcst.matchers functions and decorators."""
-    # Note that SimpleString.value includes the quotes, so we have to check value[1:-1]
-    return m.SimpleString(
-        value=m.MatchIfTrue(lambda value: literal_eval(value) in LOGLEVELS)
-    )
+    return LOG_LEVEL_LITERAL
 
 
 def TemplateString():
     """Matcher factory for use with libcst.matchers functions and decorators."""
-    return m.Call(func=m.Attribute(value=m.SimpleString(), attr=m.Name(value="format")))
+    return TEMPLATE_STRING
 
 
 def LogFunctionCall():
@@ -28,36 +68,41 @@ def LogFunctionCall():
     LOGLEVEL is assumed to be the string representation of one of the standard
     Python loglevels.
     """
-    return m.Call(
-        func=m.Name(),
-        args=[
-            m.Arg(value=TemplateString() | m.SimpleString()),
-            m.ZeroOrMore(),
-            m.Arg(value=LogLevelLiteral()),
-            m.ZeroOrMore(),
-        ],
-    )
-
-
-def split_logfunc_args(node: cst.Call) -> Tuple[List[cst.Arg], List[cst.Arg]]:
+    return LOG_FUNCTION_CALL
+
+
+def split_logfunc_args(
+    node: cst.Call,
+) -> Tuple[Optional[cst.Arg], Optional[cst.Arg], Optional[cst.Arg], List[cst.Arg]]:
+    """Sort the arguments of a log function call by role.
+
+    Returns the format string, loglevel and file arguments (None when absent)
+    and a list of the remaining arguments.  Each argument's value is checked
+    against the node type a matcher needs before the matcher is run, so most
+    arguments are classified without running any matcher at all.
+    """
     fmt, loglevel, filename = None, None, None
     unmatched = []
     for arg in node.args:
-        if m.matches(arg, m.Arg(value=LogLevelLiteral())):
+        value = arg.value
+        if isinstance(value, cst.SimpleString) and m.matches(arg, _LOGLEVEL_ARG):
             if loglevel is not None:
                 raise ValueError(
                     "Multiple loglevels found in libcst.Call node on attempt to apply logfunc parsing rules"
                 )
             loglevel = arg
-        elif m.matches(arg, m.Arg(value=TemplateString())):
+        elif isinstance(value, cst.Call) and m.matches(arg, _TEMPLATE_ARG):
             if fmt is not None:
                 raise ValueError(
                     "Multiple format strings found in libcst.Call node on attempt to apply logfunc parsing rules"
                 )
-        elif m.matches(arg, m.Arg(value=m.Name("file") | m.Name("File"))):
+            fmt = arg
+        elif isinstance(value, cst.Name) and m.matches(arg, _FILE_ARG):
             if filename is not None:
                 raise ValueError(
                     "Multiple filenames found in libcst.Call node on attempt to apply logfunc parsing rules"
                 )
+            filename = arg
         else:
             unmatched.append(arg)
+    return fmt, loglevel, filename, unmatched